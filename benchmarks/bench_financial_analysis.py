@@ -0,0 +1,203 @@
+"""
+Financial Analysis System Benchmarks
+
+Measures throughput, latency percentiles and peak memory of the analysis
+functions over seeded synthetic data in the get_sample_* shapes.
+
+Run with: python -m benchmarks.bench_financial_analysis --sizes 1000,10000 --output results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from itertools import islice
+
+from financial_analysis_system import (
+    generate_synthetic_portfolio,
+    generate_synthetic_transactions,
+    generate_price_path,
+    calculate_portfolio_value,
+    calculate_stock_performance,
+    analyze_portfolio_performance,
+    calculate_sector_allocation,
+    create_diversification_calculator,
+    calculate_volatility,
+    calculate_risk_metrics,
+    generate_risk_report,
+    categorize_transactions,
+    generate_savings_projection,
+    format_currency,
+    format_percentage,
+    monthly_performance_generator
+)
+
+# Synthetic data generators
+def scale_portfolio(rows):
+    """Return a synthetic portfolio with the given number of rows."""
+    return list(generate_synthetic_portfolio(rows))
+
+def scale_transactions(rows):
+    """Return the given number of synthetic dated transactions."""
+    # About 138 transactions per account per year
+    return list(islice(generate_synthetic_transactions(12, accounts=rows // 120 + 1), rows))
+
+def scale_prices(rows):
+    """Return a GBM price history of the given length."""
+    return list(generate_price_path(150.0, rows))
+
+def scale_returns(rows):
+    """Return a list of periodic returns of the given length."""
+    prices = scale_prices(rows + 1)
+    return [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+
+def scale_allocation_requests(rows):
+    """Return (risk profile, investment amount) pairs of the given length."""
+    profiles = ("conservative", "moderate", "aggressive")
+    return [(profiles[i % 3], 1000.0 + i) for i in range(rows)]
+
+def scale_report_options(rows):
+    """Return the given number of generate_risk_report option dictionaries."""
+    formats = ("summary", "detailed")
+    return [{"include_beta": i % 2 == 0, "include_sharpe": i % 3 != 0, "format": formats[i % 2]} for i in range(rows)]
+
+def scale_monthly_values(rows):
+    """Return a month -> value mapping of the given length."""
+    return {f"M{i}": 10000 + (i % 50) * 10 for i in range(rows)}
+
+# Benchmark definitions: name -> (data builder, call)
+BENCHMARKS = {
+    "calculate_portfolio_value": (scale_portfolio, lambda data: calculate_portfolio_value(data)),
+    "calculate_stock_performance": (scale_portfolio, lambda data: [calculate_stock_performance(stock) for stock in data]),
+    "analyze_portfolio_performance": (scale_portfolio, lambda data: analyze_portfolio_performance(data, period="1y")),
+    "calculate_sector_allocation": (scale_portfolio, lambda data: calculate_sector_allocation(data)),
+    "create_diversification_calculator": (scale_allocation_requests,
+                                          lambda data: [create_diversification_calculator(profile)(amount) for profile, amount in data]),
+    "calculate_volatility": (scale_prices, lambda data: calculate_volatility(data)),
+    "calculate_risk_metrics": (scale_returns, lambda data: calculate_risk_metrics(data)),
+    "generate_risk_report": (scale_report_options, lambda data: [generate_risk_report(**options) for options in data]),
+    "categorize_transactions": (scale_transactions, lambda data: categorize_transactions(*data)),
+    "generate_savings_projection": (lambda rows: rows, lambda years: generate_savings_projection(5000, 3000, years)),
+    "format_currency": (lambda rows: [i * 1.25 for i in range(rows)], lambda data: [format_currency(x) for x in data]),
+    "format_percentage": (lambda rows: [i / 7 for i in range(rows)], lambda data: [format_percentage(x) for x in data]),
+    "monthly_performance_generator": (scale_monthly_values, lambda data: sum(1 for _ in monthly_performance_generator(data)))
+}
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, min(len(sorted_values), round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+def run_benchmark(name, rows, *, repeats=5):
+    """Time one benchmark at one size. Returns a dictionary of measurements."""
+    build, call = BENCHMARKS[name]
+    data = build(rows)
+
+    # Warm up once, then time each repeat
+    call(data)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call(data)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    # Peak memory is measured on a separate run because tracing slows execution
+    tracemalloc.start()
+    call(data)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = percentile(timings, 0.5)
+    return {
+        "function": name,
+        "rows": rows,
+        "repeats": repeats,
+        "p50_seconds": median,
+        "p90_seconds": percentile(timings, 0.9),
+        "p99_seconds": percentile(timings, 0.99),
+        "rows_per_second": rows / median if median > 0 else 0,
+        "peak_memory_bytes": peak_memory
+    }
+
+def run_suite(sizes, *, functions=None, repeats=5, progress=None):
+    """Run every selected benchmark at every size. Returns a machine-readable result set."""
+    results = []
+    for name in functions or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name}")
+        for rows in sizes:
+            result = run_benchmark(name, rows, repeats=repeats)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+def compare_to_baseline(current, baseline, *, tolerance=0.2):
+    """Return the list of results whose median latency regressed beyond tolerance."""
+    baseline_index = {(r["function"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_index.get((result["function"], result["rows"]))
+        if previous is None or previous["p50_seconds"] <= 0:
+            continue
+        ratio = result["p50_seconds"] / previous["p50_seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "function": result["function"],
+                "rows": result["rows"],
+                "baseline_seconds": previous["p50_seconds"],
+                "current_seconds": result["p50_seconds"],
+                "slowdown": ratio
+            })
+    return regressions
+
+def main(argv=None):
+    """Command-line entry point. Returns a process exit code."""
+    parser = argparse.ArgumentParser(description="Benchmark the financial analysis functions")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated row counts, up to 10000000")
+    parser.add_argument("--functions", default=None, help="comma-separated function names")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=None, help="write JSON results to this file")
+    parser.add_argument("--baseline", default=None, help="compare against a stored JSON result file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown, e.g. 0.2 = 20%%")
+    options = parser.parse_args(argv)
+
+    sizes = [int(size) for size in options.sizes.split(",")]
+    functions = options.functions.split(",") if options.functions else None
+
+    def progress(result):
+        print(f"{result['function']:32} {result['rows']:>10} rows  "
+              f"p50 {result['p50_seconds'] * 1000:10.3f} ms  "
+              f"{result['rows_per_second']:14,.0f} rows/s  "
+              f"peak {result['peak_memory_bytes'] / 1024:10,.1f} KiB", file=sys.stderr)
+
+    current = run_suite(sizes, functions=functions, repeats=options.repeats, progress=progress)
+
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(current, output, indent=2)
+    else:
+        print(json.dumps(current, indent=2))
+
+    if options.baseline:
+        with open(options.baseline, "r") as baseline_file:
+            regressions = compare_to_baseline(current, json.load(baseline_file), tolerance=options.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['function']} at {regression['rows']} rows: "
+                  f"{regression['slowdown']:.2f}x slower", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
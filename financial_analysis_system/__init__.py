@@ -0,0 +1,153 @@
+"""
+Financial Analysis System
+
+This package provides functions for analyzing investment portfolios,
+assessing risk, tracking budgets, and generating financial reports.
+
+The core functions below are imported with the package. Larger subsystems
+(batch runner, shared market data, synthetic data, return engine, and so on)
+are loaded on first attribute access, so a plain import stays fast. They are
+left out of __all__, so "from financial_analysis_system import *" stays fast
+too; import them by name.
+"""
+
+import importlib
+
+from .core import (
+    get_sample_portfolio,
+    get_sample_transactions,
+    get_sample_financial_goals,
+    get_sample_market_data,
+    calculate_portfolio_value,
+    calculate_stock_performance,
+    analyze_portfolio_performance,
+    calculate_sector_allocation,
+    create_diversification_calculator,
+    calculate_volatility,
+    calculate_risk_metrics,
+    generate_risk_report,
+    categorize_transactions,
+    generate_savings_projection,
+    format_currency,
+    format_percentage,
+    monthly_performance_generator
+)
+
+# Public name -> submodule that defines it, imported on first access
+_LAZY_ATTRIBUTES = {
+    "SYNTHETIC_SECTOR_WEIGHTS": "synthetic",
+    "generate_price_path": "synthetic",
+    "generate_synthetic_portfolio": "synthetic",
+    "generate_synthetic_transactions": "synthetic",
+    "generate_synthetic_goals": "synthetic",
+    "generate_synthetic_market_data": "synthetic",
+    "write_synthetic_rows": "synthetic",
+    "HoldingsIndex": "holdings",
+    "RANKING_METRICS": "ranking",
+    "rank_performers": "ranking",
+    "PerformanceRanking": "ranking",
+    "PERIOD_DAYS": "returns",
+    "build_dated_history": "returns",
+    "slice_price_history": "returns",
+    "calculate_time_weighted_return": "returns",
+    "calculate_xirr_batch": "returns",
+    "calculate_xirr": "returns",
+    "analyze_period_returns": "returns",
+    "CURRENCY_FORMATS": "currency",
+    "get_sample_fx_rates": "currency",
+    "get_conversion_matrix": "currency",
+    "group_values_by_currency": "currency",
+    "calculate_multicurrency_value": "currency",
+    "format_currency_batch": "currency",
+    "RETURN_KINDS": "returns_store",
+    "ReturnsStore": "returns_store",
+    "SpendingAnomalyDetector": "anomaly",
+    "VAR_METHODS": "quantiles",
+    "QuantileSketch": "quantiles",
+    "calculate_percentiles": "quantiles",
+    "calculate_value_at_risk": "quantiles",
+    "PortfolioOptimizer": "optimizer",
+    "get_portfolio_optimizer": "optimizer",
+    "optimize_portfolio": "optimizer",
+    "EVENT_KINDS": "ledger",
+    "Ledger": "ledger",
+    "NUMERIC_MODES": "money",
+    "to_cents": "money",
+    "from_cents": "money",
+    "to_cents_array": "money",
+    "sum_money": "money",
+    "SCENARIO_METRICS": "scenarios",
+    "ScenarioEngine": "scenarios",
+    "run_stress_test": "scenarios",
+    "generate_shock_grid": "scenarios",
+    "ASSET_CLASSES": "backtest",
+    "RISK_PROFILES": "backtest",
+    "backtest_profiles": "backtest",
+    "ComputationGraph": "incremental",
+    "REPORT_NODES": "incremental",
+    "build_report_graph": "incremental",
+    "run_incremental_report": "incremental",
+    "ColumnarTable": "columnar",
+    "stock_performances_table": "columnar",
+    "sector_allocation_table": "columnar",
+    "sector_allocation_view": "columnar",
+    "projection_table": "columnar",
+    "projection_view": "columnar",
+    "LOT_METHODS": "taxlots",
+    "TaxLotBook": "taxlots",
+    "detect_recurring_cash_flows": "cashflows",
+    "stream_recurring_cash_flows": "cashflows",
+    "forecast_cash_flows": "cashflows",
+    "CursorState": "performance_cursor",
+    "PerformanceCursor": "performance_cursor",
+    "CompressedPriceSeries": "compressed_prices",
+    "series_volatility": "compressed_prices",
+    "series_risk_metrics": "compressed_prices",
+    "compress_market_data": "compressed_prices",
+    "run_portfolio_batch": "batch",
+    "MarketDataStore": "market_store",
+    "INSTRUMENTED_FUNCTIONS": "instrumentation",
+    "enable_instrumentation": "instrumentation",
+    "disable_instrumentation": "instrumentation",
+    "reset_instrumentation": "instrumentation",
+    "get_instrumentation_stats": "instrumentation",
+    "export_prometheus_metrics": "instrumentation",
+    "profile_block": "instrumentation",
+    "read_rows": "cli",
+    "write_results": "cli",
+    "main": "cli",
+    "run_demo": "cli"
+}
+
+def __getattr__(name):
+    """Import the submodule that defines name on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+__all__ = [
+    "get_sample_portfolio",
+    "get_sample_transactions",
+    "get_sample_financial_goals",
+    "get_sample_market_data",
+    "calculate_portfolio_value",
+    "calculate_stock_performance",
+    "analyze_portfolio_performance",
+    "calculate_sector_allocation",
+    "create_diversification_calculator",
+    "calculate_volatility",
+    "calculate_risk_metrics",
+    "generate_risk_report",
+    "categorize_transactions",
+    "generate_savings_projection",
+    "format_currency",
+    "format_percentage",
+    "monthly_performance_generator"
+]
@@ -0,0 +1,9 @@
+"""
+Run the command-line entry point: python -m financial_analysis_system
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Streaming detection of unusual spending per category.
+"""
+
+class SpendingAnomalyDetector:
+    """Flags transactions far from their category's recent norm, one event at a time.
+
+    Each (account, category) pair keeps an exponentially weighted mean and
+    variance, so every event costs O(1) time and memory. A transaction is scored
+    against the statistics from before it arrived, then folded into them.
+    """
+
+    def __init__(self, *, alpha=0.2, threshold=3.0, warmup=5, min_std_fraction=0.05, types=("expense",)):
+        if not 0 < alpha <= 1:
+            raise ValueError("Alpha must be between 0 and 1")
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        # Floor on the deviation so perfectly regular bills do not flag tiny changes
+        self.min_std_fraction = min_std_fraction
+        self.types = types
+        self._state = {}
+
+    def update(self, transaction):
+        """Score one transaction and update its category. Returns an anomaly dictionary or None."""
+        if transaction.get("type") not in self.types:
+            return None
+
+        key = (transaction.get("account"), transaction["category"])
+        amount = transaction["amount"]
+        state = self._state.get(key)
+        if state is None:
+            self._state[key] = [1, amount, 0.0]
+            return None
+
+        count, mean, variance = state
+        std = max(variance ** 0.5, self.min_std_fraction * abs(mean))
+        z_score = (amount - mean) / std if std > 0 else 0.0
+
+        # Exponentially weighted update of mean and variance
+        difference = amount - mean
+        increment = self.alpha * difference
+        state[0] = count + 1
+        state[1] = mean + increment
+        state[2] = (1 - self.alpha) * (variance + difference * increment)
+
+        if count >= self.warmup and abs(z_score) >= self.threshold:
+            return {
+                "date": transaction.get("date"),
+                "account": transaction.get("account"),
+                "category": transaction["category"],
+                "amount": amount,
+                "expected_amount": mean,
+                "z_score": z_score
+            }
+        return None
+
+    def process(self, transactions):
+        """Generator yielding the anomalies found in a stream of dated transactions."""
+        update = self.update
+        for transaction in transactions:
+            anomaly = update(transaction)
+            if anomaly is not None:
+                yield anomaly
+
+    def category_stats(self, category, account=None):
+        """Return the running count, mean and standard deviation of one category."""
+        state = self._state.get((account, category))
+        if state is None:
+            return {"count": 0, "mean": 0, "std": 0}
+        return {"count": state[0], "mean": state[1], "std": state[2] ** 0.5}
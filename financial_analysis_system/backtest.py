@@ -0,0 +1,96 @@
+"""
+Backtests of the diversification profiles over historical prices.
+"""
+
+from .core import calculate_risk_metrics, create_diversification_calculator
+
+ASSET_CLASSES = ("stocks", "bonds", "cash", "other")
+RISK_PROFILES = ("conservative", "moderate", "aggressive")
+
+def _period_returns(prices):
+    return [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+
+def _asset_class_returns(historical_prices, asset_prices, cash_return):
+    """Return per-period returns for each asset class, all of the same length."""
+    series = [_period_returns(prices) for prices in historical_prices.values()]
+    if not series or len({len(returns) for returns in series}) != 1 or not series[0]:
+        raise ValueError("historical_prices needs at least one ticker, all with the same number of prices (two or more)")
+    periods = len(series[0])
+
+    # Stocks are an equal-weight basket of the tickers, rebalanced each period
+    returns = {"stocks": [sum(period) / len(series) for period in zip(*series)]}
+    for asset_class in ("bonds", "cash", "other"):
+        prices = asset_prices.get(asset_class)
+        if prices is None:
+            returns[asset_class] = [cash_return] * periods
+        elif len(prices) != periods + 1:
+            raise ValueError(f"{asset_class} prices must cover the same periods as historical_prices")
+        else:
+            returns[asset_class] = _period_returns(prices)
+    return returns
+
+def _max_drawdown(values):
+    peak = values[0]
+    drawdown = 0
+    for value in values:
+        if value > peak:
+            peak = value
+        elif peak > 0:
+            drawdown = max(drawdown, (peak - value) / peak)
+    return drawdown
+
+def backtest_profiles(market_data, *, profiles=RISK_PROFILES, rebalance_every=(1, 21, 63, 252),
+                      asset_prices=None, periods_per_year=252):
+    """Replay historical prices for each risk profile and rebalancing frequency.
+
+    Allocations come from create_diversification_calculator. Stocks follow an
+    equal-weight basket of market_data["historical_prices"]. Bonds and other
+    assets follow asset_prices when given, otherwise they earn the risk-free
+    rate like cash. rebalance_every is in periods, and 0 means buy and hold.
+    All combinations advance together in one pass over time. Returns one result
+    dictionary per (profile, rebalance_every) combination.
+    """
+    risk_free_rate = (1 + market_data.get("risk_free_rate", 0.03)) ** (1 / periods_per_year) - 1
+    try:
+        returns = _asset_class_returns(market_data.get("historical_prices", {}), asset_prices or {}, risk_free_rate)
+    except ValueError as e:
+        return [{"error": str(e)}]
+    asset_returns = [returns[asset_class] for asset_class in ASSET_CLASSES]
+
+    combinations = []
+    for profile in profiles:
+        allocation = create_diversification_calculator(profile)(1.0)
+        weights = [allocation[asset_class] for asset_class in ASSET_CLASSES]
+        for frequency in rebalance_every:
+            combinations.append({"profile": profile, "rebalance_every": frequency, "weights": weights,
+                                 "holdings": list(weights), "values": [1.0]})
+
+    # Advance every combination one period at a time
+    for period, period_returns in enumerate(zip(*asset_returns), start=1):
+        for combination in combinations:
+            holdings = [h * (1 + r) for h, r in zip(combination["holdings"], period_returns)]
+            total = sum(holdings)
+            frequency = combination["rebalance_every"]
+            if frequency and period % frequency == 0:
+                holdings = [w * total for w in combination["weights"]]
+            combination["holdings"] = holdings
+            combination["values"].append(total)
+
+    results = []
+    years = len(asset_returns[0]) / periods_per_year
+    for combination in combinations:
+        values = combination["values"]
+        portfolio_returns = [(values[i] - values[i - 1]) / values[i - 1] for i in range(1, len(values))]
+        avg_return, volatility, sharpe_ratio = calculate_risk_metrics(portfolio_returns, risk_free_rate)
+        results.append({
+            "profile": combination["profile"],
+            "rebalance_every": combination["rebalance_every"],
+            "final_value": values[-1],
+            "total_return": values[-1] - 1,
+            "annualized_return": values[-1] ** (1 / years) - 1 if values[-1] > 0 else -1,
+            "average_return": avg_return,
+            "volatility": volatility,
+            "sharpe_ratio": sharpe_ratio,
+            "max_drawdown": _max_drawdown(values)
+        })
+    return results
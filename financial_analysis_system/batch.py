@@ -0,0 +1,208 @@
+"""
+Batch analysis of many portfolios across a process pool.
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import islice
+from multiprocessing import shared_memory
+
+from .core import analyze_portfolio_performance, calculate_sector_allocation
+from .money import NUMERIC_MODES
+
+_worker_price_table = None
+
+def _publish_price_table(prices):
+    """Copy a ticker -> price mapping into a shared memory block of doubles."""
+    tickers = list(prices)
+    block = shared_memory.SharedMemory(create=True, size=max(len(tickers), 1) * 8)
+    values = block.buf.cast("d")
+    for index, ticker in enumerate(tickers):
+        values[index] = float(prices[ticker])
+    values.release()
+    return block, tickers
+
+def _attach_price_table(block_name, tickers):
+    """Worker initializer that attaches to the shared price table without copying it."""
+    global _worker_price_table
+    block = shared_memory.SharedMemory(name=block_name)
+    _worker_price_table = {
+        "block": block,
+        "values": block.buf.cast("d"),
+        "index": {ticker: i for i, ticker in enumerate(tickers)}
+    }
+
+def _apply_price_table(stocks, prices=None):
+    """Return stocks with current prices taken from prices or the attached price table."""
+    if prices is None:
+        if _worker_price_table is None:
+            return stocks
+        index = _worker_price_table["index"]
+        values = _worker_price_table["values"]
+    else:
+        index = None
+
+    priced = []
+    for stock in stocks:
+        ticker = stock["ticker"]
+        if index is None:
+            if ticker in prices:
+                stock = dict(stock, current_price=prices[ticker])
+        elif ticker in index:
+            stock = dict(stock, current_price=values[index[ticker]])
+        priced.append(stock)
+    return priced
+
+def _analyze_portfolio_chunk(chunk, period, numeric_mode, prices=None):
+    """Analyze a chunk of portfolios, returning one result dictionary per portfolio."""
+    results = []
+    for stocks in chunk:
+        stocks = _apply_price_table(stocks, prices)
+        try:
+            results.append({
+                "performance": analyze_portfolio_performance(stocks, period=period, numeric_mode=numeric_mode),
+                "sector_allocation": calculate_sector_allocation(stocks)
+            })
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            # Keep the batch running and report the failure in place
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+def _encode_decimal(value):
+    """JSON fallback that keeps exact-mode Decimals exact in the checkpoint."""
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode_decimal(obj):
+    return Decimal(obj["__decimal__"]) if "__decimal__" in obj else obj
+
+def _checkpoint_settings(chunk_size, period, prices, numeric_mode):
+    """Return the run settings a checkpoint must match to be resumed."""
+    prices_digest = None
+    if prices is not None:
+        encoded = json.dumps(sorted((str(ticker), float(price)) for ticker, price in prices.items()))
+        prices_digest = hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+    return {"chunk_size": chunk_size, "period": period, "prices": prices_digest, "numeric_mode": numeric_mode}
+
+def _read_checkpoint(checkpoint_path, settings):
+    """Return (chunk results stored in a checkpoint file, byte length of its complete records).
+
+    The first line holds the settings of the run that wrote the file; a
+    ValueError is raised if they differ from settings, because the stored
+    chunks would not line up with the input.
+    """
+    completed = []
+    valid_length = 0
+    if checkpoint_path is None or not os.path.exists(checkpoint_path):
+        return completed, valid_length
+
+    with open(checkpoint_path, "rb") as checkpoint:
+        for line in checkpoint:
+            try:
+                record = json.loads(line, object_hook=_decode_decimal)
+            except ValueError:
+                # A crash may leave a partially written last line
+                break
+            if not line.endswith(b"\n"):
+                break
+            if valid_length == 0:
+                if record.get("settings") != settings:
+                    raise ValueError(f"Checkpoint {checkpoint_path} was written with different settings: {record.get('settings')}")
+            elif record.get("chunk") != len(completed):
+                break
+            else:
+                completed.append(record["results"])
+            valid_length += len(line)
+    return completed, valid_length
+
+def run_portfolio_batch(portfolios, *, period="1y", workers=None, chunk_size=500,
+                        prices=None, max_pending=None, checkpoint_path=None, numeric_mode="float"):
+    """Analyze many portfolios across a process pool. Generator yielding results in input order.
+
+    Portfolios are sent to the pool in chunks of chunk_size, with at most max_pending
+    chunks in flight so memory stays bounded however long the input is. If prices is a
+    ticker -> price mapping it is published once in shared memory and overrides each
+    stock's current_price in the workers. With checkpoint_path set, every finished chunk
+    is appended to that file and a rerun resumes after the last complete chunk; the rerun
+    must use the same chunk_size, period, prices and numeric_mode, or a ValueError is
+    raised. numeric_mode="exact" reports gains and losses as exact Decimals.
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1")
+    if numeric_mode not in NUMERIC_MODES:
+        raise ValueError(f"Numeric mode must be one of: {', '.join(NUMERIC_MODES)}")
+
+    portfolios = iter(portfolios)
+
+    # Replay chunks finished by a previous run and skip their input
+    settings = _checkpoint_settings(chunk_size, period, prices, numeric_mode)
+    completed, valid_length = _read_checkpoint(checkpoint_path, settings)
+    for results in completed:
+        list(islice(portfolios, chunk_size))
+        yield from results
+
+    checkpoint = None
+    if checkpoint_path is not None:
+        checkpoint = open(checkpoint_path, "a", newline="\n")
+        # Drop a torn last line so new records start on a line of their own
+        checkpoint.truncate(valid_length)
+        if valid_length == 0:
+            checkpoint.write(json.dumps({"settings": settings}) + "\n")
+            checkpoint.flush()
+
+    def record(chunk_number, results):
+        if checkpoint is not None:
+            checkpoint.write(json.dumps({"chunk": chunk_number, "results": results}, default=_encode_decimal) + "\n")
+            checkpoint.flush()
+
+    def chunks():
+        chunk_number = len(completed)
+        while True:
+            chunk = list(islice(portfolios, chunk_size))
+            if not chunk:
+                return
+            yield chunk_number, chunk
+            chunk_number += 1
+
+    price_block = None
+    try:
+        # workers=0 runs in-process, which is useful for small inputs and debugging
+        if workers == 0:
+            for chunk_number, chunk in chunks():
+                results = _analyze_portfolio_chunk(chunk, period, numeric_mode, prices)
+                record(chunk_number, results)
+                yield from results
+            return
+
+        initializer, initargs = None, ()
+        if prices is not None:
+            price_block, tickers = _publish_price_table(prices)
+            initializer, initargs = _attach_price_table, (price_block.name, tickers)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            limit = max_pending or 2 * (workers or os.cpu_count() or 1)
+            pending = deque()
+            for chunk_number, chunk in chunks():
+                pending.append((chunk_number, pool.submit(_analyze_portfolio_chunk, chunk, period, numeric_mode)))
+                # Backpressure: wait for the oldest chunk before reading more input
+                while len(pending) >= limit:
+                    number, future = pending.popleft()
+                    results = future.result()
+                    record(number, results)
+                    yield from results
+            while pending:
+                number, future = pending.popleft()
+                results = future.result()
+                record(number, results)
+                yield from results
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if price_block is not None:
+            price_block.close()
+            price_block.unlink()
@@ -0,0 +1,117 @@
+"""
+Recurring cash-flow detection and forward monthly forecasts.
+"""
+
+from itertools import groupby
+from statistics import median
+
+def _month_index(date):
+    """Return a running month number for an ISO date string, e.g. "2023-02-18" -> 24277."""
+    return int(date[:4]) * 12 + int(date[5:7]) - 1
+
+def _month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def _sort_key(transaction):
+    return (str(transaction.get("account", "")), transaction["type"], transaction["category"], transaction["date"])
+
+def _account_key(transaction):
+    return str(transaction.get("account", ""))
+
+def _amount_bands(rows, tolerance):
+    """Split (amount, day, month, date) rows of one category into bands of similar amounts."""
+    rows.sort()
+    bands = [[rows[0]]]
+    for row in rows[1:]:
+        base = bands[-1][0][0]
+        if row[0] - base <= tolerance * abs(base):
+            bands[-1].append(row)
+        else:
+            bands.append([row])
+    return bands
+
+def _recurring_pattern(band, min_occurrences, day_tolerance):
+    """Return the pattern of one amount band if it repeats monthly, else None."""
+    typical_day = median(row[1] for row in band)
+    per_month = {}
+    for row in band:
+        if abs(row[1] - typical_day) <= day_tolerance:
+            per_month[row[2]] = per_month.get(row[2], 0) + 1
+    # A monthly bill appears once a month; repeated rows point to everyday spending
+    months = sorted(month for month, count in per_month.items() if count == 1)
+
+    # Longest run of consecutive months
+    best_start = best_length = 0
+    run_start = 0
+    for i in range(1, len(months) + 1):
+        if i == len(months) or months[i] != months[i - 1] + 1:
+            if i - run_start > best_length:
+                best_start, best_length = run_start, i - run_start
+            run_start = i
+    if best_length < min_occurrences:
+        return None
+
+    run = set(months[best_start:best_start + best_length])
+    members = [row for row in band if row[2] in run and abs(row[1] - typical_day) <= day_tolerance]
+    return {
+        "amount": median(row[0] for row in members),
+        "day_of_month": int(typical_day),
+        "occurrences": best_length,
+        "first_date": min(row[3] for row in members),
+        "last_date": max(row[3] for row in members)
+    }
+
+def stream_recurring_cash_flows(transactions, *, min_occurrences=3, amount_tolerance=0.2, day_tolerance=5):
+    """Generator yielding recurring patterns from transactions already sorted by account, type, category and date.
+
+    Holds only one account's rows at a time, so ledgers of millions of accounts
+    can be streamed in batches from sorted files.
+    """
+    for _, account_rows in groupby(transactions, key=_account_key):
+        for (t_type, category), rows in groupby(account_rows, key=lambda row: (row["type"], row["category"])):
+            rows = list(rows)
+            if len(rows) < min_occurrences:
+                continue
+            account = rows[0].get("account")
+            # Parse each date once: (amount, day of month, month number, date)
+            parsed = [(row["amount"], int(row["date"][8:10]), _month_index(row["date"]), row["date"]) for row in rows]
+            for band in _amount_bands(parsed, amount_tolerance):
+                if len(band) < min_occurrences:
+                    continue
+                pattern = _recurring_pattern(band, min_occurrences, day_tolerance)
+                if pattern is not None:
+                    yield dict({"account": account, "type": t_type, "category": category}, **pattern)
+
+def detect_recurring_cash_flows(transactions, *, min_occurrences=3, amount_tolerance=0.2, day_tolerance=5):
+    """Return monthly recurring income and expenses found in a dated transaction list.
+
+    A pattern is a run of at least min_occurrences consecutive months with a
+    transaction of the same account, type and category, within
+    amount_tolerance (relative) of one another and within day_tolerance days
+    of the usual day of the month. The rows are sorted once and scanned once.
+    """
+    rows = sorted((t for t in transactions if "date" in t and t.get("type") in ("income", "expense")), key=_sort_key)
+    return list(stream_recurring_cash_flows(rows, min_occurrences=min_occurrences,
+                                            amount_tolerance=amount_tolerance, day_tolerance=day_tolerance))
+
+def forecast_cash_flows(recurring, months=12, *, start_month=None, active_within=1):
+    """Project recurring patterns forward month by month.
+
+    Patterns are summed together, so pass one account's patterns for a
+    per-account forecast. Only patterns seen within active_within months of the
+    latest pattern count, so bills that have stopped are left out. start_month
+    ("YYYY-MM") defaults to the month after the latest pattern. Returns a list
+    of {"month", "income", "expenses", "net"} dictionaries.
+    """
+    latest = max((_month_index(pattern["last_date"]) for pattern in recurring), default=None)
+    if latest is None:
+        return []
+    active = [pattern for pattern in recurring if latest - _month_index(pattern["last_date"]) <= active_within]
+    first = latest + 1 if start_month is None else _month_index(start_month + "-01")
+
+    income = sum(pattern["amount"] for pattern in active if pattern["type"] == "income")
+    expenses = sum(pattern["amount"] for pattern in active if pattern["type"] == "expense")
+    return [
+        {"month": _month_label(index), "income": income, "expenses": expenses, "net": income - expenses}
+        for index in range(first, first + months)
+    ]
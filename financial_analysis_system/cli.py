@@ -0,0 +1,272 @@
+"""
+Command-line entry point and the demonstration program.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+
+from .core import (
+    get_sample_portfolio,
+    get_sample_transactions,
+    get_sample_financial_goals,
+    get_sample_market_data,
+    calculate_portfolio_value,
+    analyze_portfolio_performance,
+    create_diversification_calculator,
+    calculate_volatility,
+    calculate_risk_metrics,
+    generate_risk_report,
+    categorize_transactions,
+    generate_savings_projection,
+    format_currency,
+    format_percentage,
+    monthly_performance_generator
+)
+from .returns import PERIOD_DAYS
+
+_NUMERIC_FIELDS = ("shares", "purchase_price", "current_price", "amount", "target_amount", "current_amount")
+
+def read_rows(path):
+    """Generator yielding rows from a .csv, .jsonl or .json file, one at a time where the format allows."""
+    if path.endswith(".csv"):
+        with open(path, "r", newline="") as source:
+            for row in csv.DictReader(source):
+                for field in _NUMERIC_FIELDS:
+                    if row.get(field) not in (None, ""):
+                        row[field] = float(row[field])
+                yield row
+    elif path.endswith(".jsonl"):
+        with open(path, "r") as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r") as source:
+            yield from json.load(source)
+
+def _flatten(row, prefix=""):
+    """Flatten nested dictionaries into dotted keys for tabular output."""
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def write_results(results, output, *, file_format="jsonl"):
+    """Stream result dictionaries to an open text file as jsonl, json or csv. Returns the row count.
+
+    CSV output flattens nested dictionaries into dotted column names taken from
+    the first row; keys missing from the first row are left out.
+    """
+    count = 0
+    if file_format == "jsonl":
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+            count += 1
+    elif file_format == "json":
+        output.write("[")
+        for result in results:
+            output.write((",\n" if count else "\n") + json.dumps(result))
+            count += 1
+        output.write("\n]\n")
+    elif file_format == "csv":
+        writer = None
+        for result in results:
+            row = _flatten(result)
+            if writer is None:
+                writer = csv.DictWriter(output, fieldnames=list(row), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+    else:
+        raise ValueError("Format must be 'jsonl', 'json' or 'csv'")
+    return count
+
+def _with_progress(results, label, every, *, quiet=False):
+    """Pass results through, reporting a running count on stderr every `every` rows."""
+    count = 0
+    for result in results:
+        yield result
+        count += 1
+        if not quiet and count % every == 0:
+            print(f"{label}: {count:,} processed", file=sys.stderr, flush=True)
+    if not quiet:
+        print(f"{label}: {count:,} processed (done)", file=sys.stderr, flush=True)
+
+def _risk_results(market_data):
+    """Yield volatility and risk metrics for each ticker in market data."""
+    risk_free_rate = market_data.get("risk_free_rate", 0.03)
+    for ticker, prices in market_data.get("historical_prices", {}).items():
+        returns = [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+        avg_return, volatility, sharpe_ratio = calculate_risk_metrics(returns, risk_free_rate)
+        yield {
+            "ticker": ticker,
+            "price_volatility": calculate_volatility(prices),
+            "average_return": avg_return,
+            "return_volatility": volatility,
+            "sharpe_ratio": sharpe_ratio
+        }
+
+def _budget_results(transactions, chunk_size):
+    """Categorize a transaction stream chunk by chunk and yield the merged totals."""
+    totals = categorize_transactions()
+    transactions = iter(transactions)
+    while True:
+        chunk = list(islice(transactions, chunk_size))
+        if not chunk:
+            break
+        part = categorize_transactions(*chunk)
+        for t_type in ("income", "expense"):
+            for category, amount in part[t_type].items():
+                totals[t_type][category] = totals[t_type].get(category, 0) + amount
+        totals["total_income"] += part["total_income"]
+        totals["total_expenses"] += part["total_expenses"]
+    totals["net_cashflow"] = totals["total_income"] - totals["total_expenses"]
+    yield totals
+
+def _positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main(argv=None):
+    """Command-line entry point. Runs the demonstration when called without arguments.
+
+    Commands: portfolio, risk, budget, projection and demo. The process pool is
+    imported only by the portfolio command, so short runs start quickly. Input
+    files that are missing or malformed end the run with a one-line message on
+    stderr and exit code 1.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv == ["demo"]:
+        run_demo()
+        return 0
+
+    parser = argparse.ArgumentParser(prog="financial_analysis_system",
+                                     description="Run financial analyses over input files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("--output", default="-", help="output file, '-' for stdout")
+        command.add_argument("--format", default="jsonl", choices=["jsonl", "json", "csv"])
+        command.add_argument("--chunk-size", type=_positive_int, default=500)
+        command.add_argument("--quiet", action="store_true", help="do not report progress on stderr")
+
+    portfolio_command = commands.add_parser("portfolio", help="analyze one portfolio per input row")
+    portfolio_command.add_argument("input", help=".jsonl/.json file with one list of stocks per row")
+    portfolio_command.add_argument("--period", default="1y", choices=list(PERIOD_DAYS))
+    portfolio_command.add_argument("--workers", type=int, default=None,
+                                   help="process pool size, 0 to run in-process")
+    portfolio_command.add_argument("--prices", default=None, help="JSON file of ticker -> current price")
+    add_common(portfolio_command)
+
+    risk_command = commands.add_parser("risk", help="risk metrics per ticker from market data")
+    risk_command.add_argument("input", help="JSON file in the get_sample_market_data shape")
+    add_common(risk_command)
+
+    budget_command = commands.add_parser("budget", help="categorize a transaction file")
+    budget_command.add_argument("input", help=".csv, .jsonl or .json transaction file")
+    add_common(budget_command)
+
+    projection_command = commands.add_parser("projection", help="project savings")
+    projection_command.add_argument("--income", type=float, required=True)
+    projection_command.add_argument("--expenses", type=float, required=True)
+    projection_command.add_argument("--years", type=int, required=True)
+    projection_command.add_argument("--savings-rate", type=float, default=0.2)
+    add_common(projection_command)
+
+    commands.add_parser("demo", help="run the demonstration")
+
+    options = parser.parse_args(argv)
+    if options.command == "demo":
+        run_demo()
+        return 0
+
+    try:
+        _run_command(options)
+    except (OSError, ValueError) as error:
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+def _run_command(options):
+    """Run one parsed batch command and write its results."""
+    if options.command == "portfolio":
+        # The batch runner pulls in multiprocessing, so only load it here
+        from .batch import run_portfolio_batch
+
+        prices = None
+        if options.prices:
+            with open(options.prices, "r") as price_file:
+                prices = json.load(price_file)
+        results = run_portfolio_batch(read_rows(options.input), period=options.period, workers=options.workers,
+                                      chunk_size=options.chunk_size, prices=prices)
+    elif options.command == "risk":
+        with open(options.input, "r") as market_file:
+            results = _risk_results(json.load(market_file))
+    elif options.command == "budget":
+        results = _budget_results(read_rows(options.input), options.chunk_size)
+    else:
+        results = [generate_savings_projection(options.income, options.expenses, options.years,
+                                               savings_rate=options.savings_rate)]
+
+    results = _with_progress(results, options.command, options.chunk_size, quiet=options.quiet)
+    if options.output == "-":
+        write_results(results, sys.stdout, file_format=options.format)
+    else:
+        with open(options.output, "w", newline="") as output:
+            write_results(results, output, file_format=options.format)
+
+def run_demo():
+    """Main function demonstrating financial analysis functions."""
+    print("===== FINANCIAL ANALYSIS SYSTEM =====")
+    
+    # Get sample data
+    portfolio = get_sample_portfolio()
+    transactions = get_sample_transactions()
+    goals = get_sample_financial_goals()
+    market_data = get_sample_market_data()
+    
+    # Demonstrate portfolio analysis
+    print("\n----- PORTFOLIO ANALYSIS -----")
+    value = calculate_portfolio_value(portfolio)
+    print(f"Portfolio Value: {format_currency(value)}")
+    
+    performance = analyze_portfolio_performance(portfolio, period="1y")
+    print(f"Gain/Loss: {format_currency(performance['total_gain_loss'])} " 
+          f"({format_percentage(performance['percent_gain_loss'])})")
+    
+    # Demonstrate closures and nested functions
+    conservative_calculator = create_diversification_calculator("conservative")
+    allocation = conservative_calculator(100000)
+    print(f"Conservative Allocation - Stocks: {format_currency(allocation['stocks'])}, Bonds: {format_currency(allocation['bonds'])}")
+    
+    # Demonstrate risk assessment and variable arguments
+    print("\n----- RISK ASSESSMENT -----")
+    report = generate_risk_report(format="detailed", include_beta=True)
+    print(f"Risk Report Metrics: {', '.join(report['metrics_included'])}")
+    
+    # Demonstrate transaction analysis with *args
+    print("\n----- BUDGET ANALYSIS -----")
+    transaction_args = tuple(transactions)
+    categorized = categorize_transactions(*transaction_args)
+    print(f"Total Income: {format_currency(categorized['total_income'])}")
+    print(f"Total Expenses: {format_currency(categorized['total_expenses'])}")
+    
+    # Demonstrate position-only and keyword-only arguments
+    projection = generate_savings_projection(3000, 2000, 5, savings_rate=0.25)
+    print(f"5-Year Savings: {format_currency(projection['yearly_projection'][5]['cumulative_savings'])}")
+    
+    # Demonstrate generator function
+    print("\n----- PERFORMANCE GENERATOR -----")
+    monthly_data = {"Jan": 10000, "Feb": 10500, "Mar": 10300, "Apr": 11000}
+    for month, value, change in monthly_performance_generator(monthly_data):
+        print(f"{month}: {format_currency(value)} ({format_percentage(change)})")
@@ -0,0 +1,297 @@
+"""
+Columnar result tables in contiguous buffers, with lazy dictionary views.
+"""
+
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Mapping, Sequence
+from decimal import Decimal
+
+_MAGIC = b"FASCOL1\0"
+_HEADER_LENGTH = struct.Struct("<Q")
+_TYPECODES = {"float": "d", "int": "q"}
+
+def _padding(size):
+    return -size % 8
+
+def _column_type(values):
+    if all(isinstance(value, str) for value in values):
+        return "str"
+    if all(isinstance(value, Decimal) for value in values):
+        return "decimal"
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return "int"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return "float"
+    raise ValueError("Columns must hold only strings, only Decimals or only int and float numbers")
+
+def _decimal_scale(values):
+    """Return the number of decimal places needed to store every Decimal as an integer."""
+    if not all(value.is_finite() for value in values):
+        raise ValueError("Decimal columns must hold finite values")
+    return max(max(-value.as_tuple().exponent, 0) for value in values)
+
+# Metadata is JSON; Decimals are written as {"$decimal": "12.34"} so they read back exactly
+def _metadata_default(value):
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    raise TypeError(f"Metadata value of type {type(value).__name__} is not JSON serializable")
+
+def _metadata_hook(obj):
+    if len(obj) == 1 and "$decimal" in obj:
+        return Decimal(obj["$decimal"])
+    return obj
+
+class RowView(Mapping):
+    """Read-only dictionary view of one table row; values are read from the columns on access."""
+
+    __slots__ = ("_table", "_index", "_names")
+
+    def __init__(self, table, index, names):
+        self._table = table
+        self._index = index
+        self._names = names
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        return self._table.value(name, self._index)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class RowsView(Sequence):
+    """Read-only list view of a table's rows as RowView dictionaries."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return RowView(self._table, index, self._table.column_names)
+
+    def __len__(self):
+        return self._table.row_count
+
+class KeyedView(Mapping):
+    """Read-only dictionary view of a table keyed by one column, e.g. {sector: {...}}."""
+
+    def __init__(self, table, key_column):
+        self._table = table
+        self._key_column = key_column
+        self._names = tuple(name for name in table.column_names if name != key_column)
+        self._positions = {key: i for i, key in enumerate(table.column(key_column))}
+
+    def __getitem__(self, key):
+        return RowView(self._table, self._positions[key], self._names)
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __repr__(self):
+        return repr({key: dict(row) for key, row in self.items()})
+
+class ColumnarTable:
+    """Table of equal-length typed columns held in one contiguous buffer.
+
+    Numbers are stored as packed 64-bit floats or integers. Decimals, as
+    produced by numeric_mode="exact", are stored as 64-bit integers at the
+    column's scale (cents for money) and read back as Decimals. Strings use an
+    offsets array plus one UTF-8 data buffer, as in Arrow. to_bytes() returns
+    the whole table as one byte string, ready to write to a file or shared
+    memory. from_buffer() reads it back without copying the columns, and
+    open() memory-maps a file. A small JSON metadata dictionary travels with
+    the table.
+    """
+
+    def __init__(self, buffer, header, data_offset):
+        self._buffer = memoryview(buffer)
+        self.row_count = header["rows"]
+        self.metadata = header["metadata"]
+        self._columns = {}
+        for column in header["columns"]:
+            start = data_offset + column["offset"]
+            if column["type"] == "str":
+                offsets = self._buffer[start:start + 8 * (self.row_count + 1)].cast("q")
+                data_start = start + 8 * (self.row_count + 1)
+                self._columns[column["name"]] = ("str", offsets, self._buffer[data_start:data_start + offsets[-1]])
+            elif column["type"] == "decimal":
+                view = self._buffer[start:start + 8 * self.row_count].cast("q")
+                self._columns[column["name"]] = ("decimal", view, column["scale"])
+            else:
+                view = self._buffer[start:start + 8 * self.row_count].cast(_TYPECODES[column["type"]])
+                self._columns[column["name"]] = (column["type"], view, None)
+        self.column_names = tuple(self._columns)
+        self._mapped = None
+
+    @classmethod
+    def from_rows(cls, rows, *, metadata=None, columns=None):
+        """Build a table from a list of flat dictionaries. Columns default to the first row's keys."""
+        rows = list(rows)
+        if columns is None:
+            columns = list(rows[0]) if rows else []
+        return cls.from_columns({name: [row[name] for row in rows] for name in columns}, metadata=metadata)
+
+    @classmethod
+    def from_columns(cls, columns, *, metadata=None):
+        """Build a table from {name: list of values}."""
+        return cls.from_buffer(cls._encode(columns, metadata or {}))
+
+    @staticmethod
+    def _encode(columns, metadata):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Every column must have the same length")
+        row_count = lengths.pop() if lengths else 0
+
+        buffers = []
+        descriptions = []
+        offset = 0
+        for name, values in columns.items():
+            column_type = _column_type(values) if values else "float"
+            if column_type == "str":
+                encoded = [value.encode() for value in values]
+                offsets = array("q", [0])
+                for item in encoded:
+                    offsets.append(offsets[-1] + len(item))
+                data = offsets.tobytes() + b"".join(encoded)
+                descriptions.append({"name": name, "type": column_type, "offset": offset})
+            elif column_type == "decimal":
+                scale = _decimal_scale(values)
+                data = array("q", [int(value.scaleb(scale)) for value in values]).tobytes()
+                descriptions.append({"name": name, "type": column_type, "offset": offset, "scale": scale})
+            else:
+                data = array(_TYPECODES[column_type], values).tobytes()
+                descriptions.append({"name": name, "type": column_type, "offset": offset})
+            buffers.append(data + b"\0" * _padding(len(data)))
+            offset += len(buffers[-1])
+
+        header = json.dumps({"rows": row_count, "metadata": metadata, "columns": descriptions},
+                            default=_metadata_default).encode()
+        header += b" " * _padding(len(_MAGIC) + _HEADER_LENGTH.size + len(header))
+        return b"".join([_MAGIC, _HEADER_LENGTH.pack(len(header)), header] + buffers)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """Return a table over buffer (bytes, mmap, shared memory) without copying its columns."""
+        view = memoryview(buffer)
+        if bytes(view[:len(_MAGIC)]) != _MAGIC:
+            raise ValueError("Buffer does not hold a columnar table")
+        start = len(_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack(view[len(_MAGIC):start])
+        header = json.loads(bytes(view[start:start + header_length]), object_hook=_metadata_hook)
+        return cls(view, header, start + header_length)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a table file written by write()."""
+        with open(path, "rb") as table_file:
+            mapped = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        table = cls.from_buffer(mapped)
+        table._mapped = mapped
+        return table
+
+    def to_bytes(self):
+        """Return the table as one contiguous byte string."""
+        return bytes(self._buffer)
+
+    def write(self, path):
+        """Write the table to path in one call. Returns the number of bytes written."""
+        with open(path, "wb") as table_file:
+            return table_file.write(self._buffer)
+
+    def __len__(self):
+        return self.row_count
+
+    def column(self, name):
+        """Return one column: a zero-copy float or integer view, or a list of strings or Decimals."""
+        column_type, values, data = self._columns[name]
+        if column_type == "decimal":
+            return [Decimal(value).scaleb(-data) for value in values]
+        if column_type != "str":
+            return values
+        return [bytes(data[values[i]:values[i + 1]]).decode() for i in range(self.row_count)]
+
+    def value(self, name, index):
+        """Return the value of one cell."""
+        column_type, values, data = self._columns[name]
+        if column_type == "decimal":
+            return Decimal(values[index]).scaleb(-data)
+        if column_type != "str":
+            return values[index]
+        return bytes(data[values[index]:values[index + 1]]).decode()
+
+    def rows(self):
+        """Return a lazy list-of-dictionaries view of the table."""
+        return RowsView(self)
+
+    def keyed(self, key_column):
+        """Return a lazy {key: row dictionary} view with key_column as the key."""
+        return KeyedView(self, key_column)
+
+    def release(self):
+        """Drop the table's buffer views, and unmap the file for tables from open().
+
+        Returns False if a caller still holds a column view, in which case the
+        file is unmapped once those views are released.
+        """
+        self._columns = {}
+        self._buffer.release()
+        if self._mapped is not None:
+            try:
+                self._mapped.close()
+            except BufferError:
+                return False
+            self._mapped = None
+        return True
+
+# Conversions for the analysis results
+def stock_performances_table(stock_performances):
+    """Columnar form of a list of calculate_stock_performance results."""
+    return ColumnarTable.from_rows(stock_performances, columns=["ticker", "percent_change", "dollar_change"])
+
+def sector_allocation_table(allocation):
+    """Columnar form of a calculate_sector_allocation result."""
+    sectors = allocation["sectors"]
+    return ColumnarTable.from_columns({
+        "sector": list(sectors),
+        "value": [entry["value"] for entry in sectors.values()],
+        "percentage": [entry["percentage"] for entry in sectors.values()]
+    }, metadata={"total_value": allocation["total_value"]})
+
+def sector_allocation_view(table):
+    """Lazy view of a sector allocation table in the calculate_sector_allocation shape."""
+    return {"total_value": table.metadata["total_value"], "sectors": table.keyed("sector")}
+
+def projection_table(projection):
+    """Columnar form of the yearly_projection of a generate_savings_projection result.
+
+    The projection's other fields are kept in the metadata.
+    """
+    yearly = projection["yearly_projection"]
+    metadata = {key: value for key, value in projection.items() if key != "yearly_projection"}
+    return ColumnarTable.from_columns({
+        "year": list(yearly),
+        "yearly_savings": [entry["yearly_savings"] for entry in yearly.values()],
+        "cumulative_savings": [entry["cumulative_savings"] for entry in yearly.values()]
+    }, metadata=metadata)
+
+def projection_view(table):
+    """Lazy view of a projection table in the generate_savings_projection shape."""
+    return dict(table.metadata, yearly_projection=table.keyed("year"))
@@ -0,0 +1,194 @@
+"""
+Compressed in-memory price histories that risk calculations can scan chunk by chunk.
+"""
+
+import math
+import operator
+from array import array
+from itertools import accumulate, islice
+
+# Narrowest array typecodes first: 1, 2, 4 and 8 bytes per value
+_SIGNED_TYPECODES = ("b", "h", "i", "q")
+_UNSIGNED_TYPECODES = ("B", "H", "I", "Q")
+
+def _narrowest(values, typecodes):
+    """Return values as an array of the first typecode that can hold every value."""
+    for typecode in typecodes:
+        try:
+            return array(typecode, values)
+        except OverflowError:
+            continue
+    raise OverflowError("Values do not fit in 64 bits")
+
+def _encode_chunk(values, max_decimals):
+    """Encode one chunk of floats as (count, decimals, first, packed differences).
+
+    Prices with at most max_decimals decimal places are scaled to integers and
+    stored as deltas in the narrowest integer width that holds them; decimals
+    is then the scale. Anything else falls back to XOR of the raw float bits
+    (decimals is -1), which is lossless for any float.
+    """
+    for decimals in range(max_decimals + 1):
+        scale = 10 ** decimals
+        try:
+            scaled = [round(value * scale) for value in values]
+        except (OverflowError, ValueError):
+            break
+        if all(n / scale == value for n, value in zip(scaled, values)):
+            deltas = [b - a for a, b in zip(scaled, scaled[1:])]
+            try:
+                return (len(values), decimals, scaled[0], _narrowest(deltas, _SIGNED_TYPECODES))
+            except OverflowError:
+                break
+    bits = array("Q", array("d", values).tobytes())
+    xors = [b ^ a for a, b in zip(bits, bits[1:])]
+    return (len(values), -1, bits[0], _narrowest(xors, _UNSIGNED_TYPECODES))
+
+def _decode_chunk(chunk):
+    """Return one encoded chunk as an array of floats."""
+    count, decimals, first, packed = chunk
+    if decimals < 0:
+        return array("d", array("Q", accumulate(packed, operator.xor, initial=first)).tobytes())
+    scale = 10 ** decimals
+    return array("d", [n / scale for n in accumulate(packed, initial=first)])
+
+class CompressedPriceSeries:
+    """A long price history stored as compressed fixed-size chunks.
+
+    Each chunk keeps its first price and the differences between neighbours in
+    the narrowest integer width that fits, so tick data with small moves costs
+    one or two bytes per price instead of the 32 of a list of floats. The most
+    recent prices wait uncompressed until a chunk fills. Chunks decode to
+    array('d') windows, one at a time, so scans never hold the full history.
+
+    The series supports len() and indexing (decoding one chunk at a time), so
+    calculate_volatility accepts it directly. series_volatility and
+    series_risk_metrics scan it chunk by chunk.
+    """
+
+    def __init__(self, prices=(), *, chunk_size=4096, max_decimals=6):
+        if chunk_size < 2:
+            raise ValueError("Chunk size must be at least 2")
+        self.chunk_size = chunk_size
+        self.max_decimals = max_decimals
+        self._chunks = []
+        self._tail = array("d")
+        self._cached = (None, None)
+        self.extend(prices)
+
+    def append(self, price):
+        """Add one price to the end of the series."""
+        self._tail.append(price)
+        if len(self._tail) >= self.chunk_size:
+            self._chunks.append(_encode_chunk(self._tail.tolist(), self.max_decimals))
+            self._tail = array("d")
+
+    def extend(self, prices):
+        """Add prices to the end of the series, compressing each chunk as it fills."""
+        prices = iter(prices)
+        while True:
+            self._tail.extend(islice(prices, self.chunk_size - len(self._tail)))
+            if len(self._tail) < self.chunk_size:
+                return
+            self._chunks.append(_encode_chunk(self._tail.tolist(), self.max_decimals))
+            self._tail = array("d")
+
+    def __len__(self):
+        return len(self._chunks) * self.chunk_size + len(self._tail)
+
+    def _chunk(self, index):
+        if index == len(self._chunks):
+            return self._tail
+        cached_index, values = self._cached
+        if cached_index != index:
+            values = _decode_chunk(self._chunks[index])
+            self._cached = (index, values)
+        return values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.window(*index.indices(len(self))[:2])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("price index out of range")
+        chunk_index, offset = divmod(index, self.chunk_size)
+        return self._chunk(chunk_index)[offset]
+
+    def iter_chunks(self):
+        """Yield the series as consecutive array('d') windows, one chunk at a time."""
+        for index in range(len(self._chunks)):
+            yield _decode_chunk(self._chunks[index])
+        if self._tail:
+            yield array("d", self._tail)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def window(self, start, stop):
+        """Return prices[start:stop] as an array, decoding only the chunks it overlaps."""
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        result = array("d")
+        if stop <= start:
+            return result
+        for chunk_index in range(start // self.chunk_size, (stop - 1) // self.chunk_size + 1):
+            chunk_start = chunk_index * self.chunk_size
+            result.extend(self._chunk(chunk_index)[max(start - chunk_start, 0):stop - chunk_start])
+        return result
+
+    def iter_return_chunks(self):
+        """Yield the period returns as array('d') windows, carrying prices across chunk boundaries."""
+        previous = None
+        for chunk in self.iter_chunks():
+            prices = chunk if previous is None else array("d", [previous]) + chunk
+            yield array("d", [(b - a) / a for a, b in zip(prices, prices[1:])])
+            previous = chunk[-1]
+
+    def nbytes(self):
+        """Return the approximate bytes held by the encoded chunks and the uncompressed tail."""
+        chunk_overhead = 64 + 3 * 32
+        return sum(chunk[3].itemsize * len(chunk[3]) + chunk_overhead for chunk in self._chunks) + self._tail.itemsize * len(self._tail)
+
+def _return_moments(series):
+    """Return (count, mean, sum of squared deviations) of a series' returns, merged chunk by chunk."""
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for returns in series.iter_return_chunks():
+        if not returns:
+            continue
+        chunk_count = len(returns)
+        chunk_mean = sum(returns) / chunk_count
+        chunk_m2 = sum((r - chunk_mean) ** 2 for r in returns)
+        # Combine the running and chunk moments (Chan et al.)
+        total = count + chunk_count
+        delta = chunk_mean - mean
+        mean += delta * chunk_count / total
+        m2 += chunk_m2 + delta * delta * count * chunk_count / total
+        count = total
+    return count, mean, m2
+
+def series_volatility(series):
+    """Return calculate_volatility of a compressed series without decompressing it all."""
+    count, _, m2 = _return_moments(series)
+    return math.sqrt(m2 / count) if count else 0
+
+def series_risk_metrics(series, risk_free_rate=0.03):
+    """Return calculate_risk_metrics of a compressed series' returns, computed chunk by chunk."""
+    count, avg_return, m2 = _return_moments(series)
+    if not count:
+        return (0, 0, 0)
+    volatility = math.sqrt(m2 / count) if count >= 2 else 0
+    sharpe_ratio = (avg_return - risk_free_rate) / volatility if volatility > 0 else 0
+    return (avg_return, volatility, sharpe_ratio)
+
+def compress_market_data(market_data, *, chunk_size=4096):
+    """Return a copy of market data with each historical price list compressed."""
+    compressed = dict(market_data)
+    compressed["historical_prices"] = {
+        ticker: CompressedPriceSeries(prices, chunk_size=chunk_size)
+        for ticker, prices in market_data.get("historical_prices", {}).items()
+    }
+    return compressed
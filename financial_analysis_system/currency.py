@@ -0,0 +1,65 @@
+"""
+Multi-currency valuation and currency formatting.
+"""
+
+import functools
+
+# Currency Functions
+# ISO code -> (symbol, decimal places)
+CURRENCY_FORMATS = {
+    "USD": ("$", 2), "EUR": ("€", 2), "GBP": ("£", 2), "JPY": ("¥", 0), "CHF": ("CHF ", 2),
+    "CAD": ("CA$", 2), "AUD": ("A$", 2), "NZD": ("NZ$", 2), "CNY": ("CN¥", 2), "HKD": ("HK$", 2),
+    "SGD": ("S$", 2), "INR": ("₹", 2), "KRW": ("₩", 0), "SEK": ("SEK ", 2), "NOK": ("NOK ", 2),
+    "DKK": ("DKK ", 2), "PLN": ("zł ", 2), "CZK": ("Kč ", 2), "HUF": ("Ft ", 2), "MXN": ("MX$", 2),
+    "BRL": ("R$", 2), "ZAR": ("R ", 2), "TRY": ("₺", 2), "ILS": ("₪", 2), "AED": ("AED ", 2),
+    "SAR": ("SAR ", 2), "THB": ("฿", 2), "TWD": ("NT$", 2), "IDR": ("Rp ", 2), "PHP": ("₱", 2)
+}
+
+def get_sample_fx_rates():
+    """Return sample FX rates: the value of one unit of each currency in USD."""
+    return {"USD": 1.0, "EUR": 1.08, "GBP": 1.27, "JPY": 0.0067, "CHF": 1.12, "CAD": 0.74}
+
+@functools.lru_cache(maxsize=32)
+def _conversion_matrix(rate_items):
+    """Build and cache the currency -> currency conversion factors for one rate table."""
+    rates = dict(rate_items)
+    return {source: {target: rates[source] / rates[target] for target in rates} for source in rates}
+
+def get_conversion_matrix(fx_rates):
+    """Return cached conversion factors where matrix[source][target] converts source amounts to target."""
+    return _conversion_matrix(tuple(sorted(fx_rates.items())))
+
+def group_values_by_currency(stocks):
+    """Sum position values per currency in local terms. Positions without a currency are USD."""
+    totals = {}
+    for stock in stocks:
+        currency = stock.get("currency", "USD")
+        totals[currency] = totals.get(currency, 0) + stock["shares"] * stock["current_price"]
+    return totals
+
+def calculate_multicurrency_value(stocks, fx_rates, *, target_currency="USD"):
+    """Calculate portfolio value in target_currency, converting once per currency group."""
+    matrix = get_conversion_matrix(fx_rates)
+    if target_currency not in matrix:
+        raise ValueError(f"No FX rate for target currency {target_currency}")
+
+    by_currency = {}
+    total_value = 0
+    for currency, local_value in group_values_by_currency(stocks).items():
+        if currency not in matrix:
+            raise ValueError(f"No FX rate for currency {currency}")
+        converted_value = local_value * matrix[currency][target_currency]
+        total_value += converted_value
+        by_currency[currency] = {"local_value": local_value, "converted_value": converted_value}
+
+    return {
+        "currency": target_currency,
+        "total_value": total_value,
+        "by_currency": by_currency
+    }
+
+def format_currency_batch(amounts, currency="USD"):
+    """Format many amounts in one currency, resolving the symbol and precision once."""
+    symbol, decimals = CURRENCY_FORMATS.get(currency, (f"{currency} ", 2))
+    template = symbol + "{:,.%df}" % decimals
+    return list(map(template.format, amounts))
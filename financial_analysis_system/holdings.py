@@ -0,0 +1,119 @@
+"""
+Ticker-indexed holdings with a secondary index by sector.
+"""
+
+from .core import calculate_portfolio_value
+
+# Indexed Holdings
+class HoldingsIndex:
+    """Holdings keyed by ticker with a secondary index by sector.
+
+    Lookups and point updates by ticker are O(1). Sector totals are cached and
+    only the sectors touched since the last call are re-summed, so allocation
+    queries do not rescan unrelated rows. Reads return copies of the holdings;
+    changes go through upsert and update_price so the cached totals stay valid.
+    """
+
+    def __init__(self, stocks=()):
+        self._by_ticker = {}
+        self._by_sector = {}
+        self._sector_values = {}
+        self._dirty_sectors = set()
+        self.upsert(stocks)
+
+    def __len__(self):
+        return len(self._by_ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self._by_ticker
+
+    def __iter__(self):
+        return (dict(stock) for stock in self._by_ticker.values())
+
+    def get(self, ticker, default=None):
+        """Return a copy of the stock dictionary for ticker, or default."""
+        stock = self._by_ticker.get(ticker)
+        return dict(stock) if stock is not None else default
+
+    def stocks(self):
+        """Return all holdings as a list in the get_sample_portfolio shape."""
+        return [dict(stock) for stock in self._by_ticker.values()]
+
+    def sectors(self):
+        """Return the list of sectors that currently hold positions."""
+        return list(self._by_sector)
+
+    def sector_view(self, sector):
+        """Return the holdings of one sector without scanning other sectors."""
+        return [dict(stock) for stock in self._by_sector.get(sector, {}).values()]
+
+    def upsert(self, stocks):
+        """Insert new holdings or merge fields into existing ones, matched by ticker.
+
+        Updates may be partial, e.g. {"ticker": "AAPL", "current_price": 180.0}.
+        New tickers need every field. Returns the number of rows processed.
+        """
+        count = 0
+        for update in stocks:
+            ticker = update["ticker"]
+            existing = self._by_ticker.get(ticker)
+            if existing is None:
+                stock = dict(update)
+                for field in ("shares", "purchase_price", "current_price", "sector"):
+                    if field not in stock:
+                        raise ValueError(f"New holding {ticker} is missing '{field}'")
+                self._by_ticker[ticker] = stock
+                self._by_sector.setdefault(stock["sector"], {})[ticker] = stock
+                self._dirty_sectors.add(stock["sector"])
+            else:
+                old_sector = existing["sector"]
+                existing.update(update)
+                if existing["sector"] != old_sector:
+                    self._remove_from_sector(old_sector, ticker)
+                    self._by_sector.setdefault(existing["sector"], {})[ticker] = existing
+                self._dirty_sectors.add(existing["sector"])
+            count += 1
+        return count
+
+    def update_price(self, ticker, current_price):
+        """Set the current price of one holding."""
+        stock = self._by_ticker[ticker]
+        stock["current_price"] = current_price
+        self._dirty_sectors.add(stock["sector"])
+
+    def delete(self, tickers):
+        """Remove holdings by ticker, ignoring unknown tickers. Returns the number removed."""
+        removed = 0
+        for ticker in tickers:
+            stock = self._by_ticker.pop(ticker, None)
+            if stock is not None:
+                self._remove_from_sector(stock["sector"], ticker)
+                removed += 1
+        return removed
+
+    def _remove_from_sector(self, sector, ticker):
+        members = self._by_sector[sector]
+        del members[ticker]
+        if members:
+            self._dirty_sectors.add(sector)
+        else:
+            del self._by_sector[sector]
+            self._sector_values.pop(sector, None)
+            self._dirty_sectors.discard(sector)
+
+    def sector_value(self, sector):
+        """Return the current value of one sector, re-summing it only if it changed."""
+        if sector in self._dirty_sectors:
+            self._sector_values[sector] = calculate_portfolio_value(self._by_sector[sector].values())
+            self._dirty_sectors.discard(sector)
+        return self._sector_values.get(sector, 0)
+
+    def sector_allocation(self):
+        """Return the sector allocation in the calculate_sector_allocation shape."""
+        sector_values = {sector: self.sector_value(sector) for sector in self._by_sector}
+        total_value = sum(sector_values.values())
+        return {
+            "total_value": total_value,
+            "sectors": {sector: {"value": value, "percentage": (value / total_value) * 100}
+                        for sector, value in sector_values.items()}
+        }
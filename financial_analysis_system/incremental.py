@@ -0,0 +1,227 @@
+"""
+Dependency-tracked incremental computation for the reporting pipeline.
+"""
+
+import hashlib
+import os
+import pickle
+from functools import partial
+
+from .core import (
+    calculate_portfolio_value,
+    analyze_portfolio_performance,
+    calculate_sector_allocation,
+    calculate_volatility,
+    calculate_risk_metrics,
+    categorize_transactions,
+    generate_savings_projection
+)
+
+def _fingerprint(*values):
+    """Return a content hash of values. Equal data built the same way hashes the same."""
+    return hashlib.blake2b(pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).hexdigest()
+
+def _function_id(function):
+    """Identify a node function; arguments bound with functools.partial are part of the id."""
+    if isinstance(function, partial):
+        return f"{_function_id(function.func)}{function.args!r}{sorted(function.keywords.items())!r}"
+    return f"{function.__module__}.{function.__qualname__}"
+
+class ComputationGraph:
+    """Graph of named inputs and computed nodes that recomputes only what changed.
+
+    Every value carries a fingerprint. A node reruns only when the fingerprints
+    of its dependencies differ from the last run; if its new result hashes the
+    same as before, nodes below it are left alone too. Map nodes apply a
+    function to each entry of a dictionary and cache every entry separately,
+    so a change to one ticker or one month recomputes just that entry. With
+    cache_path set, results and fingerprints are kept on disk between runs.
+    Bump a node's version when its function changes. Settings bound to a
+    function with functools.partial (such as numeric_mode) are fingerprinted
+    with it, so results cached under other settings are not reused.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self._inputs = {}
+        self._nodes = {}
+        self._cache = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, "rb") as cache_file:
+                self._cache = pickle.load(cache_file)
+        self.last_run = {"computed": [], "reused": [], "entries_computed": 0}
+
+    def set_input(self, name, value):
+        """Set or replace the value of an input."""
+        if name in self._nodes:
+            raise ValueError(f"{name} is already a computed node")
+        self._inputs[name] = value
+
+    def add_node(self, name, function, *dependencies, version=0):
+        """Add a node computing function(*dependency values)."""
+        self._add(name, ("node", function, dependencies, version))
+
+    def add_map_node(self, name, function, dependency, version=0):
+        """Add a node computing {key: function(value)} over a dictionary-valued dependency."""
+        self._add(name, ("map", function, (dependency,), version))
+
+    def _add(self, name, node):
+        if name in self._inputs or name in self._nodes:
+            raise ValueError(f"{name} is already defined")
+        self._nodes[name] = node
+
+    def _resolve(self, name, resolved):
+        """Return (value, fingerprint) of name, computing or reusing it once per run."""
+        if name in resolved:
+            return resolved[name]
+        if name in self._inputs:
+            value = self._inputs[name]
+            resolved[name] = (value, _fingerprint(value))
+            return resolved[name]
+        if name not in self._nodes:
+            raise KeyError(f"Unknown input or node: {name}")
+
+        kind, function, dependencies, version = self._nodes[name]
+        resolved[name] = None  # marks the node as in progress
+        dependency_values = []
+        dependency_prints = []
+        for dependency in dependencies:
+            if resolved.get(dependency, ()) is None:
+                raise ValueError(f"Dependency cycle through {name} and {dependency}")
+            value, fingerprint = self._resolve(dependency, resolved)
+            dependency_values.append(value)
+            dependency_prints.append(fingerprint)
+        key = _fingerprint(name, _function_id(function), version, dependency_prints)
+
+        cached = self._cache.get(name)
+        if cached is not None and cached["key"] == key:
+            self.last_run["reused"].append(name)
+            resolved[name] = (cached["value"], cached["fingerprint"])
+            return resolved[name]
+
+        if kind == "map":
+            value, entries = self._run_map(function, dependency_values[0], cached, (name, version))
+            fingerprint = _fingerprint(sorted((k, entry["fingerprint"]) for k, entry in entries.items()))
+            self._cache[name] = {"key": key, "value": value, "fingerprint": fingerprint, "entries": entries}
+        else:
+            value = function(*dependency_values)
+            self.last_run["entries_computed"] += 1
+            fingerprint = _fingerprint(value)
+            self._cache[name] = {"key": key, "value": value, "fingerprint": fingerprint}
+        self.last_run["computed"].append(name)
+        resolved[name] = (value, fingerprint)
+        return resolved[name]
+
+    def _run_map(self, function, mapping, cached, salt):
+        """Apply function to each entry, reusing entries whose input did not change."""
+        old_entries = cached.get("entries", {}) if cached is not None else {}
+        function_id = _function_id(function)
+        value = {}
+        entries = {}
+        for entry_key, entry_input in mapping.items():
+            key = _fingerprint(salt, function_id, entry_input)
+            entry = old_entries.get(entry_key)
+            if entry is None or entry["key"] != key:
+                result = function(entry_input)
+                entry = {"key": key, "value": result, "fingerprint": _fingerprint(result)}
+                self.last_run["entries_computed"] += 1
+            value[entry_key] = entry["value"]
+            entries[entry_key] = entry
+        return value, entries
+
+    def run(self, *targets):
+        """Bring targets (every node by default) up to date and return {name: value}."""
+        self.last_run = {"computed": [], "reused": [], "entries_computed": 0}
+        resolved = {}
+        names = targets or tuple(self._nodes)
+        results = {name: self._resolve(name, resolved)[0] for name in names}
+        if self.cache_path is not None:
+            self.save()
+        return results
+
+    def save(self):
+        """Write cached results for the current nodes to cache_path atomically."""
+        cache = {name: entry for name, entry in self._cache.items() if name in self._nodes}
+        temporary_path = self.cache_path + ".tmp"
+        with open(temporary_path, "wb") as cache_file:
+            pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.cache_path)
+
+# Nightly report pipeline
+def _performance(portfolio, *, numeric_mode):
+    return analyze_portfolio_performance(portfolio, numeric_mode=numeric_mode)
+
+def _risk_inputs(market_data):
+    risk_free_rate = market_data.get("risk_free_rate", 0.03)
+    return {ticker: (prices, risk_free_rate) for ticker, prices in market_data.get("historical_prices", {}).items()}
+
+def _ticker_risk(entry):
+    prices, risk_free_rate = entry
+    returns = [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+    avg_return, volatility, sharpe_ratio = calculate_risk_metrics(returns, risk_free_rate)
+    return {
+        "price_volatility": calculate_volatility(prices),
+        "average_return": avg_return,
+        "return_volatility": volatility,
+        "sharpe_ratio": sharpe_ratio
+    }
+
+def _transactions_by_month(transactions):
+    months = {}
+    for transaction in transactions:
+        months.setdefault(str(transaction.get("date", ""))[:7], []).append(transaction)
+    return months
+
+def _categorize_month(transactions, *, numeric_mode):
+    return categorize_transactions(*transactions, numeric_mode=numeric_mode)
+
+def _merge_budget(monthly, *, numeric_mode):
+    totals = categorize_transactions(numeric_mode=numeric_mode)
+    for part in monthly.values():
+        for t_type in ("income", "expense"):
+            for category, amount in part[t_type].items():
+                totals[t_type][category] = totals[t_type].get(category, 0) + amount
+        totals["total_income"] += part["total_income"]
+        totals["total_expenses"] += part["total_expenses"]
+    totals["net_cashflow"] = totals["total_income"] - totals["total_expenses"]
+    return totals
+
+def _projection(options, *, numeric_mode):
+    income, expenses, years, savings_rate = options
+    return generate_savings_projection(income, expenses, years, savings_rate=savings_rate, numeric_mode=numeric_mode)
+
+REPORT_NODES = ("portfolio_value", "performance", "sector_allocation", "risk", "budget", "projection")
+
+def build_report_graph(cache_path=None, *, numeric_mode="float"):
+    """Return a ComputationGraph of the portfolio, risk, budget and projection reports.
+
+    Set the inputs "portfolio", "transactions", "market_data" and
+    "projection_options" ((income, expenses, years, savings_rate)) before
+    calling run(). Risk is cached per ticker and the budget per calendar
+    month. numeric_mode is passed to the money functions.
+    """
+    graph = ComputationGraph(cache_path)
+    graph.add_node("portfolio_value", partial(calculate_portfolio_value, numeric_mode=numeric_mode), "portfolio")
+    graph.add_node("performance", partial(_performance, numeric_mode=numeric_mode), "portfolio")
+    graph.add_node("sector_allocation", calculate_sector_allocation, "portfolio")
+    graph.add_node("risk_inputs", _risk_inputs, "market_data")
+    graph.add_map_node("risk", _ticker_risk, "risk_inputs")
+    graph.add_node("transactions_by_month", _transactions_by_month, "transactions")
+    graph.add_map_node("budget_by_month", partial(_categorize_month, numeric_mode=numeric_mode), "transactions_by_month")
+    graph.add_node("budget", partial(_merge_budget, numeric_mode=numeric_mode), "budget_by_month")
+    graph.add_node("projection", partial(_projection, numeric_mode=numeric_mode), "projection_options")
+    return graph
+
+def run_incremental_report(cache_path, portfolio, transactions, market_data, projection=(3000, 2000, 5, 0.2), *,
+                           numeric_mode="float"):
+    """Run the report pipeline, recomputing only what changed since the last run at cache_path.
+
+    Returns (reports, last_run) where reports maps each REPORT_NODES name to
+    its result and last_run lists the computed and reused nodes.
+    """
+    graph = build_report_graph(cache_path, numeric_mode=numeric_mode)
+    graph.set_input("portfolio", portfolio)
+    graph.set_input("transactions", transactions)
+    graph.set_input("market_data", market_data)
+    graph.set_input("projection_options", tuple(projection))
+    return graph.run(*REPORT_NODES), graph.last_run
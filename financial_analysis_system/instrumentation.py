@@ -0,0 +1,213 @@
+"""
+Opt-in call instrumentation, metrics export and profiling helpers.
+"""
+
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from . import core
+
+INSTRUMENTED_FUNCTIONS = (
+    "calculate_portfolio_value", "calculate_stock_performance", "analyze_portfolio_performance", "calculate_sector_allocation",
+    "create_diversification_calculator", "calculate_volatility", "calculate_risk_metrics",
+    "generate_risk_report", "categorize_transactions", "generate_savings_projection",
+    "format_currency", "format_percentage", "monthly_performance_generator"
+)
+
+_PACKAGE = __name__.rpartition(".")[0]
+
+_instrumentation = {"originals": {}, "stats": {}, "callback": None, "sample_limit": 1000}
+
+def _input_size(args, variadic):
+    """Return the size of a call's main input: the argument count for *args functions, else the first argument's length."""
+    if variadic:
+        return len(args)
+    if args and hasattr(args[0], "__len__") and not isinstance(args[0], str):
+        return len(args[0])
+    return 1
+
+def _record_call(name, seconds, size):
+    """Add one call to the statistics of a function and notify the metrics callback."""
+    stats = _instrumentation["stats"].get(name)
+    if stats is None:
+        stats = {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "total_input_size": 0,
+                 "max_input_size": 0, "recent_seconds": deque(maxlen=_instrumentation["sample_limit"])}
+        _instrumentation["stats"][name] = stats
+
+    stats["calls"] += 1
+    stats["total_seconds"] += seconds
+    stats["max_seconds"] = max(stats["max_seconds"], seconds)
+    stats["total_input_size"] += size
+    stats["max_input_size"] = max(stats["max_input_size"], size)
+    stats["recent_seconds"].append(seconds)
+
+    if _instrumentation["callback"] is not None:
+        _instrumentation["callback"](name, seconds, size)
+
+def _instrument(name, function):
+    """Wrap a function so every call is timed and recorded."""
+    parameters = list(inspect.signature(function).parameters.values())
+    variadic = bool(parameters) and parameters[0].kind == inspect.Parameter.VAR_POSITIONAL
+
+    if inspect.isgeneratorfunction(function):
+        # Time generators over their whole iteration, not just their creation
+        @functools.wraps(function)
+        def timed_generator(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from function(*args, **kwargs)
+            finally:
+                _record_call(name, time.perf_counter() - start, _input_size(args, variadic))
+        return timed_generator
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record_call(name, time.perf_counter() - start, _input_size(args, variadic))
+    return timed
+
+def _rebind(name, current, replacement):
+    """Replace every reference to current named name in the loaded package modules."""
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not (module_name == _PACKAGE or module_name.startswith(_PACKAGE + ".")):
+            continue
+        if getattr(module, name, None) is current:
+            setattr(module, name, replacement)
+
+def enable_instrumentation(*, callback=None, sample_limit=1000):
+    """Start recording call counts, timings and input sizes for the public analysis functions.
+
+    The package functions are swapped for timed wrappers, so nothing is paid while
+    instrumentation is disabled. References taken before enabling are not instrumented.
+    callback, if given, is called as callback(name, seconds, input_size) after each call.
+    """
+    _instrumentation["callback"] = callback
+    _instrumentation["sample_limit"] = sample_limit
+    for name in INSTRUMENTED_FUNCTIONS:
+        if name not in _instrumentation["originals"]:
+            original = getattr(core, name)
+            wrapper = _instrument(name, original)
+            _instrumentation["originals"][name] = (original, wrapper)
+            _rebind(name, original, wrapper)
+
+def disable_instrumentation():
+    """Restore the original, unwrapped functions. Collected statistics are kept."""
+    for name, (original, wrapper) in _instrumentation["originals"].items():
+        _rebind(name, wrapper, original)
+    _instrumentation["originals"] = {}
+    _instrumentation["callback"] = None
+
+def reset_instrumentation():
+    """Discard all collected statistics."""
+    _instrumentation["stats"] = {}
+
+def get_instrumentation_stats():
+    """Return a dictionary of call statistics per function, with latency percentiles."""
+    report = {}
+    for name, stats in _instrumentation["stats"].items():
+        recent = sorted(stats["recent_seconds"])
+
+        def percentile(fraction):
+            return recent[min(len(recent) - 1, int(fraction * len(recent)))] if recent else 0
+
+        report[name] = {
+            "calls": stats["calls"],
+            "total_seconds": stats["total_seconds"],
+            "mean_seconds": stats["total_seconds"] / stats["calls"],
+            "max_seconds": stats["max_seconds"],
+            "p50_seconds": percentile(0.5),
+            "p90_seconds": percentile(0.9),
+            "p99_seconds": percentile(0.99),
+            "total_input_size": stats["total_input_size"],
+            "max_input_size": stats["max_input_size"]
+        }
+    return report
+
+def export_prometheus_metrics(*, prefix="financial_analysis"):
+    """Return the collected statistics in Prometheus text exposition format."""
+    stats = sorted(get_instrumentation_stats().items())
+
+    # Each metric family is written as one contiguous group
+    lines = [f"# TYPE {prefix}_calls_total counter"]
+    for name, function_stats in stats:
+        lines.append(f'{prefix}_calls_total{{function="{name}"}} {function_stats["calls"]}')
+
+    lines.append(f"# TYPE {prefix}_call_seconds summary")
+    for name, function_stats in stats:
+        for quantile, key in (("0.5", "p50_seconds"), ("0.9", "p90_seconds"), ("0.99", "p99_seconds")):
+            lines.append(f'{prefix}_call_seconds{{function="{name}",quantile="{quantile}"}} {function_stats[key]}')
+        lines.append(f'{prefix}_call_seconds_sum{{function="{name}"}} {function_stats["total_seconds"]}')
+        lines.append(f'{prefix}_call_seconds_count{{function="{name}"}} {function_stats["calls"]}')
+
+    lines.append(f"# TYPE {prefix}_input_size_total counter")
+    for name, function_stats in stats:
+        lines.append(f'{prefix}_input_size_total{{function="{name}"}} {function_stats["total_input_size"]}')
+
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def profile_block(mode="cprofile", *, interval=0.001, output_path=None):
+    """Profile the enclosed block. Yields a dictionary that is filled in when the block exits.
+
+    mode="cprofile" records every call with cProfile; the result holds a pstats.Stats
+    under "stats". mode="sampling" samples the current thread's stack every interval
+    seconds with low overhead; the result holds sample counts per function under "samples".
+    """
+    if mode not in ("cprofile", "sampling"):
+        raise ValueError("Profile mode must be 'cprofile' or 'sampling'")
+
+    result = {"mode": mode}
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            result["stats"] = pstats.Stats(profiler)
+            if output_path is not None:
+                result["stats"].dump_stats(output_path)
+        return
+
+    # Sampling mode: a background thread inspects this thread's frames
+    target_thread = threading.get_ident()
+    samples = {}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target_thread)
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                # Count each function once per sample so recursion is not inflated
+                if key not in seen:
+                    samples[key] = samples.get(key, 0) + 1
+                    seen.add(key)
+                frame = frame.f_back
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield result
+    finally:
+        stop.set()
+        sampler.join()
+        result["samples"] = dict(sorted(samples.items(), key=lambda item: item[1], reverse=True))
+        if output_path is not None:
+            with open(output_path, "w") as output:
+                json.dump(result["samples"], output, indent=2)
@@ -0,0 +1,257 @@
+"""
+Append-only event ledger of trades, price updates and cash flows, with snapshots.
+"""
+
+import bisect
+import copy
+import datetime
+import json
+import os
+import struct
+
+# Event kind codes stored in the first byte of each record
+EVENT_KINDS = {"trade": 1, "price": 2, "income": 3, "expense": 4}
+_KIND_NAMES = {code: name for name, code in EVENT_KINDS.items()}
+
+# kind, date ordinal, two values, byte lengths of the name and label strings
+_RECORD = struct.Struct("<BIddHH")
+
+def _empty_state():
+    return {"sequence": 0, "date": None, "cash": 0.0, "positions": {}, "income": {}, "expense": {}}
+
+def _apply(state, event):
+    """Fold one event into an aggregated state dictionary."""
+    kind = event["kind"]
+    if kind == "trade":
+        position = state["positions"].setdefault(event["ticker"], {
+            "shares": 0.0, "cost": 0.0, "current_price": event["price"], "sector": event["sector"]
+        })
+        quantity = event["quantity"]
+        if quantity >= 0:
+            position["cost"] += quantity * event["price"]
+        elif position["shares"] > 0:
+            # Sales release cost basis at the average price
+            position["cost"] *= max(position["shares"] + quantity, 0) / position["shares"]
+        position["shares"] += quantity
+        position["current_price"] = event["price"]
+        if event["sector"]:
+            position["sector"] = event["sector"]
+        state["cash"] -= quantity * event["price"]
+        if position["shares"] == 0:
+            del state["positions"][event["ticker"]]
+    elif kind == "price":
+        position = state["positions"].get(event["ticker"])
+        if position is not None:
+            position["current_price"] = event["price"]
+    else:
+        totals = state[kind]
+        totals[event["category"]] = totals.get(event["category"], 0) + event["amount"]
+        state["cash"] += event["amount"] if kind == "income" else -event["amount"]
+    state["sequence"] += 1
+    state["date"] = event["date"]
+
+class Ledger:
+    """Event-sourced record of a portfolio and its cash over time.
+
+    Events are appended to a compact binary log and never rewritten. Every
+    snapshot_interval events the aggregated state is written to a snapshot file
+    together with the log offset it covers, so state_at() replays only the tail
+    after the nearest snapshot. Writes are fsynced in batches of sync_every
+    events; call flush() to force one.
+    """
+
+    def __init__(self, path, *, snapshot_interval=1000, sync_every=100):
+        if snapshot_interval < 1 or sync_every < 1:
+            raise ValueError("Snapshot interval and sync batch size must be at least 1")
+        self.path = path
+        self.snapshot_path = path + ".snapshots"
+        self.snapshot_interval = snapshot_interval
+        self.sync_every = sync_every
+        self._snapshots = self._read_snapshots()
+
+        # Recover the current state from the last snapshot and drop any torn final record
+        self._state = _empty_state()
+        offset = 0
+        if self._snapshots:
+            self._state = copy.deepcopy(self._snapshots[-1]["state"])
+            offset = self._snapshots[-1]["offset"]
+        for event, end in self._read_events(offset):
+            _apply(self._state, event)
+            offset = end
+        self._log = open(path, "ab")
+        if self._log.tell() > offset:
+            self._log.truncate(offset)
+            # truncate() leaves the position past the new end; snapshots record tell()
+            self._log.seek(offset)
+        self._unsynced = 0
+
+    def _read_snapshots(self):
+        """Return the complete snapshots on file, cutting off a snapshot line torn by a crash."""
+        snapshots = []
+        if not os.path.exists(self.snapshot_path):
+            return snapshots
+        valid_length = 0
+        with open(self.snapshot_path, "rb") as snapshot_file:
+            for line in snapshot_file:
+                try:
+                    snapshot = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                snapshots.append(snapshot)
+                valid_length += len(line)
+        # Later snapshots are appended, so they must not follow a partial line
+        if os.path.getsize(self.snapshot_path) > valid_length:
+            with open(self.snapshot_path, "ab") as snapshot_file:
+                snapshot_file.truncate(valid_length)
+        return snapshots
+
+    def _read_events(self, offset=0):
+        """Yield (event, end offset) for each complete record from offset onwards."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as log:
+            log.seek(offset)
+            while True:
+                header = log.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                code, day, first, second, name_length, label_length = _RECORD.unpack(header)
+                text = log.read(name_length + label_length)
+                if len(text) < name_length + label_length or code not in _KIND_NAMES:
+                    return
+                offset += _RECORD.size + name_length + label_length
+                yield self._decode(code, day, first, second, text[:name_length].decode(), text[name_length:].decode()), offset
+
+    @staticmethod
+    def _decode(code, day, first, second, name, label):
+        kind = _KIND_NAMES[code]
+        event = {"kind": kind, "date": datetime.date.fromordinal(day).isoformat()}
+        if kind == "trade":
+            event.update(ticker=name, quantity=first, price=second, sector=label)
+        elif kind == "price":
+            event.update(ticker=name, price=first)
+        else:
+            event.update(category=name, amount=first)
+        return event
+
+    def _append(self, kind, date, first, second=0.0, name="", label=""):
+        name_bytes = name.encode()
+        label_bytes = label.encode()
+        day = datetime.date.fromisoformat(date).toordinal()
+        self._log.write(_RECORD.pack(EVENT_KINDS[kind], day, first, second, len(name_bytes), len(label_bytes)))
+        self._log.write(name_bytes + label_bytes)
+        _apply(self._state, self._decode(EVENT_KINDS[kind], day, first, second, name, label))
+
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.flush()
+        if self._state["sequence"] % self.snapshot_interval == 0:
+            self.snapshot()
+        return self._state["sequence"]
+
+    def record_trade(self, date, ticker, quantity, price, sector=""):
+        """Append a trade; negative quantities are sales. Returns the new event count."""
+        return self._append("trade", date, quantity, price, ticker, sector)
+
+    def record_price(self, date, ticker, price):
+        """Append a price update for a held ticker. Returns the new event count."""
+        return self._append("price", date, price, name=ticker)
+
+    def record_cash_flow(self, date, flow_type, amount, category):
+        """Append an income or expense cash flow. Returns the new event count."""
+        if flow_type not in ("income", "expense"):
+            raise ValueError("Cash flow type must be 'income' or 'expense'")
+        return self._append(flow_type, date, amount, name=category)
+
+    def record_transactions(self, transactions):
+        """Append transaction dictionaries as cash flows. Returns the new event count."""
+        for transaction in transactions:
+            self.record_cash_flow(transaction["date"], transaction["type"], transaction["amount"], transaction["category"])
+        return self._state["sequence"]
+
+    def flush(self):
+        """Write buffered events and fsync the log."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._unsynced = 0
+
+    def snapshot(self):
+        """Persist the current aggregated state so replays can start from here."""
+        self.flush()
+        record = {"sequence": self._state["sequence"], "offset": self._log.tell(), "state": self._state}
+        with open(self.snapshot_path, "a", newline="\n") as snapshot_file:
+            snapshot_file.write(json.dumps(record) + "\n")
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        self._snapshots.append(json.loads(json.dumps(record)))
+
+    def __len__(self):
+        return self._state["sequence"]
+
+    def events(self, start=0):
+        """Yield the logged events from event number start onwards, in order."""
+        self._log.flush()
+        for sequence, (event, _) in enumerate(self._read_events()):
+            if sequence >= start:
+                yield event
+
+    def state_at(self, sequence=None):
+        """Return the aggregated state after the first sequence events (all events by default)."""
+        if sequence is None or sequence >= self._state["sequence"]:
+            return copy.deepcopy(self._state)
+        self._log.flush()
+
+        # Start from the latest snapshot at or before sequence, then replay the tail
+        index = bisect.bisect_right(self._snapshots, sequence, key=lambda snapshot: snapshot["sequence"])
+        state = _empty_state()
+        offset = 0
+        if index:
+            state = copy.deepcopy(self._snapshots[index - 1]["state"])
+            offset = self._snapshots[index - 1]["offset"]
+        if state["sequence"] < sequence:
+            for event, _ in self._read_events(offset):
+                _apply(state, event)
+                if state["sequence"] >= sequence:
+                    break
+        return state
+
+    def positions(self, sequence=None):
+        """Return holdings as stock dictionaries usable by the portfolio functions."""
+        positions = self.state_at(sequence)["positions"]
+        return [
+            {
+                "ticker": ticker,
+                "shares": position["shares"],
+                "purchase_price": position["cost"] / position["shares"] if position["shares"] else 0,
+                "current_price": position["current_price"],
+                "sector": position["sector"]
+            }
+            for ticker, position in positions.items()
+        ]
+
+    def cash_flow_summary(self, sequence=None):
+        """Return income and expense totals per category in the shape of categorize_transactions."""
+        state = self.state_at(sequence)
+        total_income = sum(state["income"].values())
+        total_expenses = sum(state["expense"].values())
+        return {
+            "income": state["income"],
+            "expense": state["expense"],
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "net_cashflow": total_income - total_expenses
+        }
+
+    def close(self):
+        """Flush outstanding events and close the log."""
+        if not self._log.closed:
+            self.flush()
+            self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
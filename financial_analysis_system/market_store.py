@@ -0,0 +1,177 @@
+"""
+Market data shared between processes through versioned shared memory blocks.
+"""
+
+import json
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+_MARKET_HEADER = struct.Struct("<qdddqq")
+_CONTROL = struct.Struct("<qq")
+
+# Blocks created by this process, which its resource tracker is meant to clean up
+_created_block_names = set()
+
+class MarketDataStore:
+    """Market data published once into shared memory and read zero-copy by other processes.
+
+    A small control block named store_name holds a sequence counter and the current
+    version. Each publish writes a complete new data block and then swaps the version,
+    so readers always see one whole version and never a half-written one.
+    """
+
+    def __init__(self, store_name, *, create=False):
+        self.store_name = store_name
+        self._owner = create
+        self._blocks = {}
+        self._stale_blocks = []
+        if create:
+            self._control = _create_shared_block(store_name, _CONTROL.size)
+            _CONTROL.pack_into(self._control.buf, 0, 0, 0)
+        else:
+            self._control = _attach_shared_block(store_name)
+
+    def publish(self, market_data):
+        """Write market data as a new version and make it current. Returns the new version."""
+        if not self._owner:
+            raise ValueError("Only the store that created the control block can publish")
+
+        sequence, previous_version = _CONTROL.unpack_from(self._control.buf, 0)
+        version = previous_version + 1
+
+        # Lay out the directory of tickers and the concatenated price arrays
+        historical_prices = market_data.get("historical_prices", {})
+        directory = []
+        offset = 0
+        for ticker, prices in historical_prices.items():
+            directory.append([ticker, offset, len(prices)])
+            offset += len(prices)
+        directory_bytes = json.dumps(directory).encode()
+        directory_size = (len(directory_bytes) + 7) // 8 * 8
+        prices_start = _MARKET_HEADER.size + directory_size
+
+        block = _create_shared_block(f"{self.store_name}_{version}", prices_start + max(offset, 1) * 8)
+        _MARKET_HEADER.pack_into(block.buf, 0, version,
+                                 market_data.get("risk_free_rate", 0.0),
+                                 market_data.get("market_return", 0.0),
+                                 market_data.get("volatility", 0.0),
+                                 len(directory), len(directory_bytes))
+        block.buf[_MARKET_HEADER.size:_MARKET_HEADER.size + len(directory_bytes)] = directory_bytes
+        for ticker, start, length in directory:
+            struct.pack_into(f"{length}d", block.buf, prices_start + start * 8, *historical_prices[ticker])
+
+        # Seqlock swap: an odd sequence tells readers a swap is in progress
+        struct.pack_into("<q", self._control.buf, 0, sequence + 1)
+        struct.pack_into("<q", self._control.buf, 8, version)
+        struct.pack_into("<q", self._control.buf, 0, sequence + 2)
+
+        # Readers that already attached keep their mapping after unlink
+        self._blocks[version] = block
+        if previous_version in self._blocks:
+            old_block = self._blocks.pop(previous_version)
+            _unlink_shared_block(old_block)
+            if not _close_shared_block(old_block):
+                self._stale_blocks.append(old_block)
+        return version
+
+    def current_version(self):
+        """Return the version currently published, waiting out any swap in progress."""
+        while True:
+            first_sequence, version = _CONTROL.unpack_from(self._control.buf, 0)
+            second_sequence, _ = _CONTROL.unpack_from(self._control.buf, 0)
+            if first_sequence % 2 == 0 and first_sequence == second_sequence:
+                return version
+
+    def snapshot(self):
+        """Return the current market data with price histories as zero-copy float views."""
+        while True:
+            version = self.current_version()
+            if version == 0:
+                raise ValueError("No market data has been published to this store")
+            if version not in self._blocks:
+                try:
+                    block = _attach_shared_block(f"{self.store_name}_{version}")
+                except FileNotFoundError:
+                    # A newer version replaced this one while attaching
+                    continue
+                self._retire_blocks()
+                self._blocks[version] = block
+            block = self._blocks[version]
+            break
+
+        (_, risk_free_rate, market_return, volatility,
+         ticker_count, directory_length) = _MARKET_HEADER.unpack_from(block.buf, 0)
+        directory = json.loads(bytes(block.buf[_MARKET_HEADER.size:_MARKET_HEADER.size + directory_length]))
+        prices_start = _MARKET_HEADER.size + (directory_length + 7) // 8 * 8
+
+        historical_prices = {}
+        for ticker, start, length in directory:
+            begin = prices_start + start * 8
+            historical_prices[ticker] = block.buf[begin:begin + length * 8].cast("d")
+
+        return {
+            "version": version,
+            "risk_free_rate": risk_free_rate,
+            "market_return": market_return,
+            "volatility": volatility,
+            "historical_prices": historical_prices
+        }
+
+    def _retire_blocks(self):
+        """Detach from older versions once no snapshot views into them remain."""
+        self._stale_blocks.extend(self._blocks.values())
+        self._blocks = {}
+        self._stale_blocks = [block for block in self._stale_blocks if not _close_shared_block(block)]
+
+    def close(self):
+        """Detach from every block; the creating store also removes them."""
+        for block in self._blocks.values():
+            _close_shared_block(block)
+            if self._owner:
+                _unlink_shared_block(block)
+        self._retire_blocks()
+        _close_shared_block(self._control)
+        if self._owner:
+            _unlink_shared_block(self._control)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _create_shared_block(name, size):
+    """Create a named shared memory block owned by this process."""
+    block = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _created_block_names.add(block.name)
+    return block
+
+def _attach_shared_block(name):
+    """Attach to a block created by another store without taking over its cleanup.
+
+    Before Python 3.13 attaching registers the block with this process's
+    resource tracker, which unlinks it when the process exits, removing it from
+    under the owner and every other reader. The registration is dropped again
+    unless this process created the block itself.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    block = shared_memory.SharedMemory(name=name)
+    if block.name not in _created_block_names:
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+def _unlink_shared_block(block):
+    """Remove a block created by this process."""
+    block.unlink()
+    _created_block_names.discard(block.name)
+
+def _close_shared_block(block):
+    """Close a shared memory block unless callers still hold views into it. Returns True if closed."""
+    try:
+        block.close()
+    except BufferError:
+        # Views handed out by snapshot() are still alive
+        return False
+    return True
@@ -0,0 +1,122 @@
+"""
+Exact money arithmetic in integer cents, used by the core functions with numeric_mode="exact".
+"""
+
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+
+NUMERIC_MODES = ("float", "exact")
+
+_ONE = Decimal(1)
+
+def to_cents(amount):
+    """Return amount as an integer number of cents, rounding half cents up (away from zero).
+
+    Floats are read as their shortest decimal form, so 0.1 is ten cents. Values
+    that are already whole cents skip Decimal entirely.
+    """
+    if isinstance(amount, int):
+        return amount * 100
+    if isinstance(amount, float):
+        scaled = amount * 100
+        cents = round(scaled)
+        if abs(scaled - cents) < 1e-6:
+            return cents
+        amount = repr(amount)
+    return int((Decimal(amount) * 100).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+def _decimal(value):
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+def _product_cents(quantity, price):
+    """Return quantity * price in cents, exact for decimal inputs."""
+    if isinstance(quantity, int) and isinstance(price, int):
+        return quantity * price * 100
+    if isinstance(quantity, (int, float)) and isinstance(price, (int, float)):
+        scaled = quantity * price * 100
+        cents = round(scaled)
+        if abs(scaled - cents) < 1e-6:
+            return cents
+    product = _decimal(quantity) * _decimal(price)
+    return int((product * 100).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    """Return cents as a Decimal with two places, e.g. 718000 -> Decimal('7180.00')."""
+    return Decimal(cents).scaleb(-2)
+
+def to_cents_array(amounts):
+    """Return amounts as a packed array of 64-bit integer cents."""
+    return array("q", map(to_cents, amounts))
+
+def sum_money(amounts):
+    """Return the exact sum of amounts as a two-place Decimal."""
+    return from_cents(sum(to_cents_array(amounts)))
+
+# Exact versions of the core money functions
+def calculate_portfolio_value_exact(stocks):
+    """Exact calculate_portfolio_value: each position is rounded to the cent, then summed."""
+    positions = array("q", (_product_cents(stock["shares"], stock["current_price"]) for stock in stocks))
+    return from_cents(sum(positions))
+
+def calculate_cost_basis_exact(stocks):
+    """Exact purchase cost of a portfolio, rounded to the cent per position like its value."""
+    positions = array("q", (_product_cents(stock["shares"], stock["purchase_price"]) for stock in stocks))
+    return from_cents(sum(positions))
+
+def categorize_transactions_exact(*transactions):
+    """Exact categorize_transactions: same structure, with Decimal amounts."""
+    totals = {"income": {}, "expense": {}}
+    for transaction in transactions:
+        if "type" not in transaction or "amount" not in transaction or "category" not in transaction:
+            continue
+        t_type = transaction["type"]
+        if t_type in totals:
+            category_totals = totals[t_type]
+            category = transaction["category"]
+            category_totals[category] = category_totals.get(category, 0) + to_cents(transaction["amount"])
+
+    total_income = sum(totals["income"].values())
+    total_expenses = sum(totals["expense"].values())
+    return {
+        "income": {category: from_cents(cents) for category, cents in totals["income"].items()},
+        "expense": {category: from_cents(cents) for category, cents in totals["expense"].items()},
+        "total_income": from_cents(total_income),
+        "total_expenses": from_cents(total_expenses),
+        "net_cashflow": from_cents(total_income - total_expenses)
+    }
+
+def generate_savings_projection_exact(income, expenses, years, /, *, savings_rate=0.2, forecast=None):
+    """Exact generate_savings_projection: money values are Decimals, rates stay floats."""
+    if income < 0 or expenses < 0 or years < 1:
+        return {"error": "Invalid input values"}
+
+    if savings_rate < 0 or savings_rate > 1:
+        return {"error": "Savings rate must be between 0 and 1"}
+
+    income_cents = to_cents(income)
+    expenses_cents = to_cents(expenses)
+    monthly_cents = income_cents - expenses_cents
+    projection = {
+        "monthly_income": from_cents(income_cents),
+        "monthly_expenses": from_cents(expenses_cents),
+        "current_monthly_savings": from_cents(monthly_cents),
+        "current_savings_rate": monthly_cents / income_cents if income_cents > 0 else 0,
+        "target_savings_rate": savings_rate,
+        "target_monthly_savings": from_cents(_product_cents(income, savings_rate)),
+        "yearly_projection": {}
+    }
+
+    forecast_cents = [to_cents(month["net"]) for month in forecast] if forecast else None
+    total_cents = 0
+    for year in range(1, years + 1):
+        if forecast_cents:
+            yearly_cents = sum(forecast_cents[month % len(forecast_cents)] for month in range((year - 1) * 12, year * 12))
+        else:
+            yearly_cents = monthly_cents * 12
+        total_cents += yearly_cents
+        projection["yearly_projection"][year] = {
+            "yearly_savings": from_cents(yearly_cents),
+            "cumulative_savings": from_cents(total_cents)
+        }
+
+    return projection
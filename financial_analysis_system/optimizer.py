@@ -0,0 +1,188 @@
+"""
+Mean-variance portfolio optimization over historical prices.
+"""
+
+import functools
+import math
+from operator import mul
+
+from .core import calculate_risk_metrics
+
+def _dot(a, b):
+    return sum(map(mul, a, b))
+
+class PortfolioOptimizer:
+    """Efficient frontier, minimum-variance and max-Sharpe weights for a set of assets.
+
+    Weights are fully invested (they sum to 1) and may be negative (short
+    positions). Returns, the covariance matrix and its Cholesky factorization
+    are computed once per optimizer. Every frontier point is a combination of
+    the same two solved vectors, so extra points or risk-free rates cost O(n)
+    each and never refactor the matrix. Returns and the risk-free rate use the
+    same per-period units as calculate_risk_metrics.
+    """
+
+    def __init__(self, historical_prices, *, shrinkage=0.0):
+        if not historical_prices:
+            raise ValueError("At least one asset is required")
+        if not 0 <= shrinkage <= 1:
+            raise ValueError("Shrinkage must be between 0 and 1")
+        self.tickers = list(historical_prices)
+        lengths = {len(prices) for prices in historical_prices.values()}
+        if len(lengths) != 1 or lengths.pop() < 2:
+            raise ValueError("Every asset needs the same number of prices, at least two")
+
+        # Period returns per asset, the same definition calculate_volatility uses
+        self._returns = []
+        for ticker in self.tickers:
+            prices = historical_prices[ticker]
+            self._returns.append([(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))])
+        periods = len(self._returns[0])
+        self.mean_returns = [sum(returns) / periods for returns in self._returns]
+
+        # Population covariance, matching the variance in calculate_risk_metrics
+        centered = [[r - mean for r in returns] for returns, mean in zip(self._returns, self.mean_returns)]
+        size = len(self.tickers)
+        covariance = [[0.0] * size for _ in range(size)]
+        for i in range(size):
+            row = centered[i]
+            for j in range(i + 1):
+                value = _dot(row, centered[j]) / periods
+                if i != j:
+                    value *= 1 - shrinkage
+                covariance[i][j] = covariance[j][i] = value
+        self.covariance = covariance
+        self._cholesky = self._factorize(covariance)
+
+        # The two solves every frontier point is built from
+        self._inv_ones = self._solve([1.0] * size)
+        self._inv_means = self._solve(self.mean_returns)
+        self._a = sum(self._inv_ones)
+        self._b = sum(self._inv_means)
+        self._c = _dot(self.mean_returns, self._inv_means)
+        self._d = self._a * self._c - self._b ** 2
+
+    def _factorize(self, matrix):
+        """Return the lower Cholesky factor of matrix, stored row by row."""
+        size = len(matrix)
+        lower = [[] for _ in range(size)]
+        for i in range(size):
+            row = lower[i]
+            for j in range(i):
+                row.append((matrix[i][j] - _dot(row, lower[j])) / lower[j][j])
+            diagonal = matrix[i][i] - _dot(row, row)
+            if diagonal <= 1e-14 * max(matrix[i][i], 1e-300):
+                raise ValueError(f"Covariance is singular at {self.tickers[i]}; add shrinkage or more history")
+            row.append(math.sqrt(diagonal))
+        return lower
+
+    def _solve(self, vector):
+        """Solve covariance @ x = vector with the cached factorization."""
+        lower = self._cholesky
+        size = len(lower)
+        forward = []
+        for i in range(size):
+            row = lower[i]
+            forward.append((vector[i] - _dot(row, forward)) / row[i])
+        solution = [0.0] * size
+        for i in range(size - 1, -1, -1):
+            total = forward[i]
+            for k in range(i + 1, size):
+                total -= lower[k][i] * solution[k]
+            solution[i] = total / lower[i][i]
+        return solution
+
+    def _point(self, weights, risk_free_rate, variance=None):
+        expected_return = _dot(weights, self.mean_returns)
+        if variance is None:
+            variance = sum(w * _dot(row, weights) for w, row in zip(weights, self.covariance))
+        volatility = math.sqrt(max(variance, 0.0))
+        return {
+            "expected_return": expected_return,
+            "volatility": volatility,
+            "sharpe_ratio": (expected_return - risk_free_rate) / volatility if volatility > 0 else 0,
+            "weights": dict(zip(self.tickers, weights))
+        }
+
+    def _frontier_scales(self, target_return):
+        """Return the multipliers of the two solved vectors for one target return."""
+        if self._d <= 1e-18 * max(self._a * self._c, 1e-300):
+            # Every asset has the same mean: only the minimum-variance portfolio is efficient
+            return (1 / self._a, 0.0)
+        return ((self._c - target_return * self._b) / self._d, (target_return * self._a - self._b) / self._d)
+
+    def weights_for_return(self, target_return):
+        """Return the minimum-variance weights that achieve target_return."""
+        ones_scale, means_scale = self._frontier_scales(target_return)
+        return [ones_scale * x + means_scale * y for x, y in zip(self._inv_ones, self._inv_means)]
+
+    def min_variance(self, risk_free_rate=0.03):
+        """Return the global minimum-variance portfolio."""
+        return self._point([x / self._a for x in self._inv_ones], risk_free_rate)
+
+    def max_sharpe(self, risk_free_rate=0.03):
+        """Return the tangency (max-Sharpe) portfolio, or an error when none exists."""
+        scale = self._b - risk_free_rate * self._a
+        if scale <= 0:
+            return {"error": "Risk-free rate is not below the minimum-variance return; no tangency portfolio exists"}
+        weights = [(y - risk_free_rate * x) / scale for x, y in zip(self._inv_ones, self._inv_means)]
+        return self._point(weights, risk_free_rate)
+
+    def efficient_frontier(self, points=50, risk_free_rate=0.03, max_return=None):
+        """Return points along the efficient frontier from the minimum-variance return up to max_return.
+
+        max_return defaults to the highest single-asset mean return.
+        """
+        if points < 1:
+            raise ValueError("Points must be at least 1")
+        low = self._b / self._a
+        high = max(self.mean_returns) if max_return is None else max_return
+        high = max(high, low)
+        step = (high - low) / (points - 1) if points > 1 else 0
+        frontier = []
+        for i in range(points):
+            target_return = low + i * step
+            ones_scale, means_scale = self._frontier_scales(target_return)
+            weights = [ones_scale * x + means_scale * y for x, y in zip(self._inv_ones, self._inv_means)]
+            # covariance @ weights is ones_scale * 1 + means_scale * means, so the variance needs no matrix product
+            variance = ones_scale * sum(weights) + means_scale * _dot(weights, self.mean_returns)
+            frontier.append(self._point(weights, risk_free_rate, variance))
+        return frontier
+
+    def portfolio_risk_metrics(self, weights, risk_free_rate=0.03):
+        """Return calculate_risk_metrics of the weighted portfolio's historical return series."""
+        if isinstance(weights, dict):
+            weights = [weights.get(ticker, 0) for ticker in self.tickers]
+        portfolio_returns = [_dot(weights, period) for period in zip(*self._returns)]
+        return calculate_risk_metrics(portfolio_returns, risk_free_rate)
+
+@functools.lru_cache(maxsize=8)
+def _cached_optimizer(price_items, shrinkage):
+    """Build and cache the optimizer, and so its factorization, for one price table."""
+    return PortfolioOptimizer({ticker: list(prices) for ticker, prices in price_items}, shrinkage=shrinkage)
+
+def get_portfolio_optimizer(historical_prices, *, shrinkage=0.0):
+    """Return a cached PortfolioOptimizer for historical_prices, reusing the factorization across calls."""
+    price_items = tuple((ticker, tuple(prices)) for ticker, prices in historical_prices.items())
+    return _cached_optimizer(price_items, shrinkage)
+
+def optimize_portfolio(market_data, points=50, *, shrinkage=0.0, periods_per_year=1):
+    """Compute the efficient frontier and optimal portfolios from a market data dictionary.
+
+    Uses its historical_prices and risk_free_rate. The rate is annual; pass the
+    number of price periods per year (12 for monthly prices) to convert it to a
+    per-period rate. Returns a dictionary with the frontier points and the
+    minimum-variance and max-Sharpe portfolios.
+    """
+    risk_free_rate = (1 + market_data.get("risk_free_rate", 0.03)) ** (1 / periods_per_year) - 1
+    try:
+        optimizer = get_portfolio_optimizer(market_data.get("historical_prices", {}), shrinkage=shrinkage)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {
+        "tickers": optimizer.tickers,
+        "risk_free_rate": risk_free_rate,
+        "frontier": optimizer.efficient_frontier(points, risk_free_rate),
+        "min_variance": optimizer.min_variance(risk_free_rate),
+        "max_sharpe": optimizer.max_sharpe(risk_free_rate)
+    }
@@ -0,0 +1,92 @@
+"""
+Resumable monthly performance streams with persisted running statistics.
+"""
+
+import json
+import os
+from collections import namedtuple
+from itertools import islice
+
+CursorState = namedtuple("CursorState", [
+    "position", "last_month", "previous_value", "changes", "mean_change", "m2", "peak", "max_drawdown"
+])
+
+_INITIAL_STATE = CursorState(0, None, None, 0, 0.0, 0.0, None, 0.0)
+
+class PerformanceCursor:
+    """Continues monthly_performance_generator from where the last call stopped.
+
+    The cursor remembers how many months it has consumed, the previous value
+    and running statistics of the monthly changes. advance() over a growing
+    series skips the months already seen and yields the same
+    (month, value, percent_change) tuples as monthly_performance_generator for
+    the new ones. The state is an immutable CursorState that is replaced after
+    each month, so readers on other threads can take snapshot() at any time
+    without locking and always see a consistent state.
+    """
+
+    def __init__(self, state=None, *, path=None):
+        self.path = path
+        if state is None and path is not None and os.path.exists(path):
+            with open(path, "r") as state_file:
+                state = CursorState(**json.load(state_file))
+        self._state = state or _INITIAL_STATE
+
+    def snapshot(self):
+        """Return the current state; it never changes after it is returned."""
+        return self._state
+
+    def advance(self, data):
+        """Generator yielding (month, value, percent_change) for months not yet consumed.
+
+        data is the full monthly series (month -> value, in order), as passed to
+        monthly_performance_generator. Raises ValueError if the months already
+        consumed no longer match the series.
+        """
+        state = self._state
+        items = iter(data.items())
+        if state.position:
+            seen = list(islice(items, state.position - 1, state.position))
+            if not seen or seen[0][0] != state.last_month:
+                raise ValueError("Series does not continue the months this cursor has consumed")
+
+        for month, value in items:
+            previous_value = state.previous_value
+            if previous_value is not None:
+                percent_change = (value - previous_value) / previous_value * 100
+                # Welford update of the mean and variance of the monthly changes
+                changes = state.changes + 1
+                delta = percent_change - state.mean_change
+                mean_change = state.mean_change + delta / changes
+                m2 = state.m2 + delta * (percent_change - mean_change)
+            else:
+                percent_change = 0
+                changes, mean_change, m2 = state.changes, state.mean_change, state.m2
+            peak = value if state.peak is None or value > state.peak else state.peak
+            drawdown = (peak - value) / peak * 100 if peak > 0 else 0.0
+            state = CursorState(state.position + 1, month, value, changes, mean_change, m2, peak,
+                                max(state.max_drawdown, drawdown))
+            self._state = state
+            yield (month, value, percent_change)
+
+    def stats(self):
+        """Return summary statistics of every month consumed so far."""
+        state = self._state
+        return {
+            "months": state.position,
+            "last_month": state.last_month,
+            "last_value": state.previous_value,
+            "average_change": state.mean_change,
+            "change_volatility": (state.m2 / state.changes) ** 0.5 if state.changes else 0,
+            "max_drawdown": state.max_drawdown
+        }
+
+    def save(self, path=None):
+        """Persist the current state as JSON, atomically. Defaults to the cursor's path."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path to save the cursor state to")
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as state_file:
+            json.dump(self._state._asdict(), state_file)
+        os.replace(temporary_path, path)
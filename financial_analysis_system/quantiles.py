@@ -0,0 +1,206 @@
+"""
+Value-at-risk, expected shortfall and percentiles, exact or from mergeable sketches.
+"""
+
+import heapq
+import math
+import random
+from statistics import NormalDist
+
+from .core import calculate_risk_metrics
+
+VAR_METHODS = ("historical", "parametric", "sketch")
+
+def _select(values, k):
+    """Return the k-th smallest value (0-based) by quickselect, in expected linear time."""
+    values = list(values)
+    while True:
+        pivot = values[random.randrange(len(values))]
+        lower = [v for v in values if v < pivot]
+        if k < len(lower):
+            values = lower
+            continue
+        equal_count = sum(1 for v in values if v == pivot)
+        if k < len(lower) + equal_count:
+            return pivot
+        k -= len(lower) + equal_count
+        values = [v for v in values if v > pivot]
+
+def calculate_percentiles(values, *percentiles):
+    """Return exact percentiles (0-100) of values by selection rather than a full sort.
+
+    Uses the nearest-rank definition. Returns a tuple in the order requested.
+    """
+    if not values:
+        return tuple(0 for _ in percentiles)
+    count = len(values)
+    results = []
+    for p in percentiles:
+        if not 0 <= p <= 100:
+            raise ValueError("Percentiles must be between 0 and 100")
+        rank = max(1, math.ceil(round(p / 100 * count, 9)))
+        results.append(_select(values, rank - 1))
+    return tuple(results)
+
+class QuantileSketch:
+    """KLL-style mergeable quantile sketch with bounded memory.
+
+    Values enter a stack of compactors. When a level fills it is sorted and every
+    other value is promoted to the next level with double weight. Sketches built
+    on separate chunks or processes can be merged, and the rank error stays
+    around 1.7 / k of the count.
+    """
+
+    def __init__(self, k=200, *, seed=None):
+        self.k = k
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._rng = random.Random(seed)
+        self._compactors = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level):
+        depth = len(self._compactors) - level - 1
+        return int(math.ceil((2 / 3) ** depth * self.k)) + 1
+
+    def _grow(self):
+        self._compactors.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self._compactors)))
+
+    def _compress(self):
+        for level, items in enumerate(self._compactors):
+            if len(items) >= self._capacity(level):
+                if level + 1 >= len(self._compactors):
+                    self._grow()
+                items.sort()
+                # Keep an odd leftover in place, promote every other value
+                leftover = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.randrange(2)
+                self._compactors[level + 1].extend(items[offset::2])
+                self._compactors[level] = leftover
+                break
+        self._size = sum(len(items) for items in self._compactors)
+
+    def update(self, value):
+        """Add one value to the sketch."""
+        self._compactors[0].append(value)
+        self._size += 1
+        self.count += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values):
+        """Add many values to the sketch."""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other):
+        """Fold another sketch into this one and return self."""
+        while len(self._compactors) < len(other._compactors):
+            self._grow()
+        for level, items in enumerate(other._compactors):
+            self._compactors[level].extend(items)
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._size = sum(len(items) for items in self._compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = [(value, 2 ** level) for level, values in enumerate(self._compactors) for value in values]
+        items.sort()
+        return items
+
+    def quantile(self, fraction):
+        """Return the approximate value at the given fraction (0-1) of the distribution."""
+        if self.count == 0:
+            return 0
+        items = self._weighted_items()
+        target = fraction * sum(weight for _, weight in items)
+        cumulative = 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return items[-1][0]
+
+    def tail_mean(self, fraction):
+        """Return the approximate mean of the values at or below the given fraction."""
+        if self.count == 0:
+            return 0
+        items = self._weighted_items()
+        target = max(fraction * sum(weight for _, weight in items), 1)
+        total = 0
+        cumulative = 0
+        for value, weight in items:
+            used = min(weight, target - cumulative)
+            total += value * used
+            cumulative += used
+            if cumulative >= target:
+                break
+        return total / cumulative
+
+    def to_dict(self):
+        """Return a JSON-serializable form of the sketch for sending between processes."""
+        return {"k": self.k, "count": self.count, "minimum": self.minimum, "maximum": self.maximum,
+                "compactors": [list(items) for items in self._compactors]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a sketch from to_dict() output."""
+        sketch = cls(data["k"])
+        sketch._compactors = [list(items) for items in data["compactors"]]
+        sketch._max_size = sum(sketch._capacity(level) for level in range(len(sketch._compactors)))
+        sketch._size = sum(len(items) for items in sketch._compactors)
+        sketch.count = data["count"]
+        sketch.minimum = data["minimum"]
+        sketch.maximum = data["maximum"]
+        return sketch
+
+def calculate_value_at_risk(returns, confidence=0.95, *, method="historical", sketch_size=200):
+    """Calculate value-at-risk and expected shortfall (CVaR) of a return series.
+
+    Both are returned as positive losses in a (var, cvar) tuple. "historical" is
+    exact, using partial selection of the worst returns; "parametric" assumes
+    normal returns with the mean and volatility from calculate_risk_metrics;
+    "sketch" streams returns through a QuantileSketch. returns may also be a
+    QuantileSketch already built over chunks or processes.
+    """
+    if method not in VAR_METHODS:
+        raise ValueError(f"VaR method must be one of: {', '.join(VAR_METHODS)}")
+    if not 0 < confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1")
+
+    tail = 1 - confidence
+    if isinstance(returns, QuantileSketch) or method == "sketch":
+        sketch = returns
+        if not isinstance(sketch, QuantileSketch):
+            sketch = QuantileSketch(sketch_size)
+            sketch.extend(returns)
+        if sketch.count == 0:
+            return (0, 0)
+        return (-sketch.quantile(tail), -sketch.tail_mean(tail))
+
+    if not returns:
+        return (0, 0)
+
+    if method == "parametric":
+        avg_return, volatility, _ = calculate_risk_metrics(returns, 0)
+        normal = NormalDist()
+        z = normal.inv_cdf(confidence)
+        var = -(avg_return - z * volatility)
+        cvar = -(avg_return - volatility * normal.pdf(z) / tail)
+        return (var, cvar)
+
+    # Historical: only the worst ceil(tail * n) returns are needed
+    # (rounded so 1 - 0.95 does not tip an exact count over to the next integer)
+    worst = heapq.nsmallest(max(1, math.ceil(round(tail * len(returns), 9))), returns)
+    return (-worst[-1], -sum(worst) / len(worst))
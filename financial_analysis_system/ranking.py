@@ -0,0 +1,93 @@
+"""
+Top and bottom performer queries without full sorts.
+"""
+
+import bisect
+import heapq
+
+from .core import calculate_stock_performance
+
+# Performance Ranking Functions
+RANKING_METRICS = ("percent_change", "dollar_change")
+
+def rank_performers(stocks, n=5, *, by="percent_change", sector=None, bottom=False):
+    """Return the top (or bottom) n stock performances without sorting the whole portfolio.
+
+    Uses heapq partial selection, so the cost is O(len(stocks) * log n).
+    Results have the analyze_portfolio_performance performer shape.
+    """
+    if by not in RANKING_METRICS:
+        raise ValueError(f"Ranking metric must be one of: {', '.join(RANKING_METRICS)}")
+    if n <= 0:
+        return []
+
+    performances = (calculate_stock_performance(stock) for stock in stocks
+                    if sector is None or stock["sector"] == sector)
+    select = heapq.nsmallest if bottom else heapq.nlargest
+    return select(n, performances, key=lambda performance: performance[by])
+
+class PerformanceRanking:
+    """Ranked stock performances kept current as prices change.
+
+    Each update moves one entry within sorted lists (overall and per sector)
+    by binary search, so top and bottom queries never need a full re-sort.
+    """
+
+    def __init__(self, stocks=(), *, by="percent_change"):
+        if by not in RANKING_METRICS:
+            raise ValueError(f"Ranking metric must be one of: {', '.join(RANKING_METRICS)}")
+        self.by = by
+        self._stocks = {}
+        self._keys = {}
+        self._ranked = []
+        self._ranked_by_sector = {}
+        for stock in stocks:
+            self.upsert(stock)
+
+    def _insert(self, ticker):
+        stock = self._stocks[ticker]
+        key = (calculate_stock_performance(stock)[self.by], ticker)
+        self._keys[ticker] = key
+        bisect.insort(self._ranked, key)
+        bisect.insort(self._ranked_by_sector.setdefault(stock["sector"], []), key)
+
+    def _remove(self, ticker):
+        key = self._keys.pop(ticker)
+        sector = self._stocks[ticker]["sector"]
+        for ranked in (self._ranked, self._ranked_by_sector[sector]):
+            del ranked[bisect.bisect_left(ranked, key)]
+        if not self._ranked_by_sector[sector]:
+            del self._ranked_by_sector[sector]
+
+    def upsert(self, stock):
+        """Add a stock, or replace the stored fields of an existing ticker."""
+        ticker = stock["ticker"]
+        if ticker in self._stocks:
+            self._remove(ticker)
+            stock = dict(self._stocks[ticker], **stock)
+        self._stocks[ticker] = dict(stock)
+        self._insert(ticker)
+
+    def update_price(self, ticker, current_price):
+        """Apply a price tick to one ticker and re-rank only that ticker."""
+        self._remove(ticker)
+        self._stocks[ticker]["current_price"] = current_price
+        self._insert(ticker)
+
+    def remove(self, ticker):
+        """Stop ranking a ticker."""
+        self._remove(ticker)
+        del self._stocks[ticker]
+
+    def _performances(self, keys):
+        return [calculate_stock_performance(self._stocks[ticker]) for _, ticker in keys]
+
+    def top(self, n=5, *, sector=None):
+        """Return the n best performers, best first, optionally within one sector."""
+        ranked = self._ranked if sector is None else self._ranked_by_sector.get(sector, [])
+        return self._performances(reversed(ranked[-n:])) if n > 0 else []
+
+    def bottom(self, n=5, *, sector=None):
+        """Return the n worst performers, worst first, optionally within one sector."""
+        ranked = self._ranked if sector is None else self._ranked_by_sector.get(sector, [])
+        return self._performances(ranked[:n]) if n > 0 else []
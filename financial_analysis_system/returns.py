@@ -0,0 +1,215 @@
+"""
+Time-weighted and money-weighted period returns over dated price histories.
+"""
+
+import bisect
+import datetime
+import math
+
+# Period Return Functions
+PERIOD_DAYS = {"1m": 30, "3m": 91, "6m": 182, "1y": 365, "5y": 1826}
+
+def _as_date(value):
+    """Return value as a datetime.date, accepting ISO date strings."""
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    return value
+
+def build_dated_history(prices, end_date, *, step_days=1):
+    """Return (ISO date, price) pairs for an undated price list whose last price is on end_date."""
+    end = _as_date(end_date)
+    count = len(prices)
+    return [((end - datetime.timedelta(days=(count - 1 - i) * step_days)).isoformat(), price)
+            for i, price in enumerate(prices)]
+
+def slice_price_history(history, period, *, end_date=None):
+    """Return the part of a date-sorted (date, price) history that falls within period.
+
+    The window ends on end_date (default: the last date in history) and starts
+    PERIOD_DAYS[period] days earlier. Both bounds are found by binary search.
+    """
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Period must be one of: {', '.join(PERIOD_DAYS)}")
+    if not history:
+        return []
+
+    end = _as_date(end_date) if end_date is not None else _as_date(history[-1][0])
+    start = end - datetime.timedelta(days=PERIOD_DAYS[period])
+    first = bisect.bisect_left(history, start.isoformat(), key=lambda row: str(row[0]))
+    last = bisect.bisect_right(history, end.isoformat(), key=lambda row: str(row[0]))
+    return history[first:last]
+
+def calculate_time_weighted_return(valuations, cash_flows=None):
+    """Calculate the time-weighted return of a series of (date, value) valuations.
+
+    cash_flows maps a date to the external amount added (positive) or withdrawn
+    (negative) on that date; valuations on that date include the flow. Each
+    sub-period return removes the flow so that only investment performance counts.
+    """
+    if len(valuations) < 2:
+        return 0
+    flows = {str(date): amount for date, amount in (cash_flows or {}).items()}
+
+    growth = 1.0
+    for (_, previous_value), (date, value) in zip(valuations, valuations[1:]):
+        if previous_value == 0:
+            continue
+        growth *= (value - flows.get(str(date), 0)) / previous_value
+    return growth - 1
+
+def _npv_and_derivative(rate, times, amounts):
+    """Return the net present value at rate and its derivative with respect to rate."""
+    npv = 0.0
+    derivative = 0.0
+    base = 1 + rate
+    for t, amount in zip(times, amounts):
+        discount = base ** -t
+        npv += amount * discount
+        derivative -= t * amount * discount / base
+    return npv, derivative
+
+def calculate_xirr_batch(accounts, *, guess=0.1, tolerance=1e-9, max_iterations=50):
+    """Calculate the annualized money-weighted return (XIRR) for many accounts at once.
+
+    Each account is a list of (date, amount) cash flows, negative for money invested
+    and positive for money returned. All accounts take Newton steps together; any
+    account that diverges or fails to converge is solved by bisection on a bracket.
+    Returns a list of rates, with None where no rate exists (all flows of one sign).
+    """
+    # Precompute year fractions once per account
+    problems = []
+    for cash_flows in accounts:
+        flows = sorted((_as_date(date), amount) for date, amount in cash_flows)
+        if not flows or all(a >= 0 for _, a in flows) or all(a <= 0 for _, a in flows):
+            problems.append(None)
+            continue
+        first_date = flows[0][0]
+        problems.append(([(date - first_date).days / 365 for date, _ in flows],
+                         [amount for _, amount in flows]))
+
+    rates = [guess if problem is not None else None for problem in problems]
+    active = [i for i, problem in enumerate(problems) if problem is not None]
+    needs_bracketing = []
+
+    # Lock-step Newton iterations over every unconverged account
+    for _ in range(max_iterations):
+        if not active:
+            break
+        still_active = []
+        for i in active:
+            times, amounts = problems[i]
+            npv, derivative = _npv_and_derivative(rates[i], times, amounts)
+            if derivative == 0:
+                needs_bracketing.append(i)
+                continue
+            new_rate = rates[i] - npv / derivative
+            if not -0.9999 < new_rate < 1e6 or math.isnan(new_rate):
+                needs_bracketing.append(i)
+                continue
+            if abs(new_rate - rates[i]) < tolerance:
+                rates[i] = new_rate
+            else:
+                rates[i] = new_rate
+                still_active.append(i)
+        active = still_active
+    needs_bracketing.extend(active)
+
+    # Bisection fallback on an expanding bracket
+    for i in needs_bracketing:
+        times, amounts = problems[i]
+        low, high = -0.9999, 1.0
+        low_npv = _npv_and_derivative(low, times, amounts)[0]
+        high_npv = _npv_and_derivative(high, times, amounts)[0]
+        while low_npv * high_npv > 0 and high < 1e6:
+            high *= 10
+            high_npv = _npv_and_derivative(high, times, amounts)[0]
+        if low_npv * high_npv > 0:
+            rates[i] = None
+            continue
+        for _ in range(200):
+            middle = (low + high) / 2
+            middle_npv = _npv_and_derivative(middle, times, amounts)[0]
+            if abs(middle_npv) < tolerance or high - low < tolerance:
+                break
+            if (middle_npv > 0) == (low_npv > 0):
+                low, low_npv = middle, middle_npv
+            else:
+                high = middle
+        rates[i] = middle
+    return rates
+
+def calculate_xirr(cash_flows, *, guess=0.1):
+    """Calculate the annualized money-weighted return of one list of (date, amount) cash flows."""
+    return calculate_xirr_batch([cash_flows], guess=guess)[0]
+
+def _price_on(history, date):
+    """Return the latest price on or before date in a date-sorted (date, price) history."""
+    position = bisect.bisect_right(history, date, key=lambda row: str(row[0]))
+    return history[position - 1][1]
+
+def analyze_period_returns(stocks, price_history, period, *, end_date=None, cash_flows=None):
+    """Calculate time- and money-weighted portfolio returns over a period.
+
+    price_history maps each ticker to a date-sorted list of (date, price) pairs.
+    cash_flows is an optional list of (date, amount) external flows into the
+    portfolio, held as uninvested cash. Every ticker shares one window, ending
+    on end_date (default: the latest date in any history). Valuations use each
+    ticker's latest price on or before the valuation date, and start once every
+    ticker has a price, so histories that do not line up are not read as gains.
+    """
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Period must be one of: {', '.join(PERIOD_DAYS)}")
+    histories = {stock["ticker"]: price_history[stock["ticker"]] for stock in stocks if price_history.get(stock["ticker"])}
+    if not histories:
+        return {"analysis_period": period, "error": "No price history within period"}
+
+    end = _as_date(end_date).isoformat() if end_date is not None else max(str(h[-1][0]) for h in histories.values())
+    start = (_as_date(end) - datetime.timedelta(days=PERIOD_DAYS[period])).isoformat()
+    histories = {ticker: history for ticker, history in histories.items() if str(history[0][0]) <= end}
+    if not histories:
+        return {"analysis_period": period, "error": "No price history within period"}
+    start = max([start] + [str(history[0][0]) for history in histories.values()])
+
+    dates = {start}
+    for history in histories.values():
+        window = slice_price_history(history, period, end_date=end)
+        dates.update(str(date) for date, _ in window if str(date) > start)
+    flows_in_period = sorted((_as_date(date).isoformat(), amount) for date, amount in cash_flows or []
+                             if start < _as_date(date).isoformat() <= end)
+    flow_totals = {}
+    for date, amount in flows_in_period:
+        flow_totals[date] = flow_totals.get(date, 0) + amount
+    dates = sorted(dates | set(flow_totals))
+
+    # Value the holdings plus the cash from flows so far on every relevant date
+    valuations = []
+    cash = 0
+    for date in dates:
+        cash += flow_totals.get(date, 0)
+        value = cash
+        for stock in stocks:
+            history = histories.get(stock["ticker"])
+            if history is not None:
+                value += stock["shares"] * _price_on(history, date)
+        valuations.append((date, value))
+
+    # Money-weighted: start value and contributions go in, end value comes out
+    irr_flows = [(dates[0], -valuations[0][1])]
+    irr_flows += [(date, -amount) for date, amount in flows_in_period]
+    irr_flows.append((dates[-1], valuations[-1][1]))
+
+    stock_returns = {}
+    for ticker, history in histories.items():
+        first_price = _price_on(history, dates[0])
+        stock_returns[ticker] = _price_on(history, dates[-1]) / first_price - 1 if first_price else 0
+
+    return {
+        "analysis_period": period,
+        "start_date": dates[0],
+        "end_date": dates[-1],
+        "start_value": valuations[0][1],
+        "end_value": valuations[-1][1],
+        "time_weighted_return": calculate_time_weighted_return(valuations, flow_totals),
+        "money_weighted_return": calculate_xirr(irr_flows),
+        "stock_returns": stock_returns
+    }
@@ -0,0 +1,177 @@
+"""
+Persistent store of precomputed simple and log returns per ticker.
+"""
+
+import math
+import mmap
+import os
+from array import array
+
+from .core import calculate_risk_metrics
+
+RETURN_KINDS = ("simple", "log")
+
+class ReturnsStore:
+    """Prices and their simple and log returns kept on disk as raw arrays of doubles.
+
+    Returns are derived once when prices are appended; appending only computes
+    the returns of the new tail. Reads are memory-mapped, so risk functions can
+    consume the stored returns without copying or recomputing them. Files use the
+    machine's native double layout.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._maps = {}
+
+    def _path(self, ticker, kind):
+        if not ticker or os.sep in ticker or (os.altsep and os.altsep in ticker) or ticker.startswith("."):
+            raise ValueError(f"Invalid ticker for a file name: {ticker!r}")
+        return os.path.join(self.directory, f"{ticker}.{kind}.f64")
+
+    def tickers(self):
+        """Return the tickers that have stored prices."""
+        suffix = ".prices.f64"
+        return sorted(name[:-len(suffix)] for name in os.listdir(self.directory) if name.endswith(suffix))
+
+    def _last_price(self, ticker):
+        """Return the last stored price of ticker, or None if nothing is stored."""
+        path = self._path(ticker, "prices")
+        if not os.path.exists(path) or os.path.getsize(path) < 8:
+            return None
+        last = array("d")
+        with open(path, "rb") as prices_file:
+            prices_file.seek(-8, os.SEEK_END)
+            last.fromfile(prices_file, 1)
+        return last[0]
+
+    def _read_prices(self, ticker, start, stop):
+        """Return stored prices[start:stop] of ticker, read from disk."""
+        prices = array("d")
+        with open(self._path(ticker, "prices"), "rb") as prices_file:
+            prices_file.seek(start * 8)
+            prices.fromfile(prices_file, stop - start)
+        return prices
+
+    def _repair(self, ticker):
+        """Bring the return files of ticker back in line with its prices after an interrupted append.
+
+        Prices are written last, so they mark what was committed: returns past
+        them are cut off, missing returns are recomputed from the prices, and a
+        partially written value is dropped.
+        """
+        prices_path = self._path(ticker, "prices")
+        paths = [self._path(ticker, kind) for kind in ("simple", "log")]
+        prices_size, simple_size, log_size = (os.path.getsize(path) if os.path.exists(path) else 0
+                                              for path in [prices_path] + paths)
+        if prices_size % 8:
+            with open(prices_path, "ab") as prices_file:
+                prices_file.truncate(prices_size - prices_size % 8)
+        expected = max(prices_size // 8 - 1, 0)
+        if simple_size == log_size == expected * 8:
+            return
+
+        start = min(simple_size // 8, log_size // 8, expected)
+        for path in paths:
+            with open(path, "ab") as output:
+                output.truncate(start * 8)
+        if start < expected:
+            self._write_returns(ticker, _derive_returns(ticker, self._read_prices(ticker, start, expected + 1)))
+
+    def _write_returns(self, ticker, returns):
+        """Append (simple returns, log returns) arrays to the return files of ticker."""
+        for kind, values in zip(("simple", "log"), returns):
+            with open(self._path(ticker, kind), "ab") as output:
+                values.tofile(output)
+
+    def append_prices(self, ticker, prices):
+        """Append new prices for ticker and store the returns they add. Returns the number of new returns.
+
+        The returns are written before the prices, so an append interrupted by a
+        crash never commits prices without their returns; the next append
+        repairs the return files first.
+        """
+        new_prices = array("d", prices)
+        if not new_prices:
+            return 0
+        self._repair(ticker)
+
+        # Only the tail needs returns: the last stored price links old and new data
+        previous = self._last_price(ticker)
+        returns = _derive_returns(ticker, ([previous] if previous is not None else []) + list(new_prices))
+        self._write_returns(ticker, returns)
+        with open(self._path(ticker, "prices"), "ab") as output:
+            new_prices.tofile(output)
+        return len(returns[0])
+
+    def load_market_data(self, market_data):
+        """Append the historical_prices of a market data dictionary. Returns the tickers loaded."""
+        historical_prices = market_data.get("historical_prices", {})
+        for ticker, prices in historical_prices.items():
+            self.append_prices(ticker, prices)
+        return list(historical_prices)
+
+    def _view(self, ticker, kind):
+        """Return a zero-copy float view of the whole values in one stored array.
+
+        A partially written trailing value left by an interrupted append is not mapped.
+        """
+        path = self._path(ticker, kind)
+        if not os.path.exists(path):
+            raise KeyError(ticker)
+        size = os.path.getsize(path)
+        size -= size % 8
+        if size == 0:
+            return memoryview(b"").cast("d")
+
+        # Re-map only when the file has grown; older maps stay valid for existing views
+        cached = self._maps.get((ticker, kind))
+        if cached is None or cached[0] != size:
+            with open(path, "rb") as data_file:
+                cached = (size, mmap.mmap(data_file.fileno(), size, access=mmap.ACCESS_READ))
+            self._maps[(ticker, kind)] = cached
+        return memoryview(cached[1]).cast("d")
+
+    def prices(self, ticker):
+        """Return the stored prices of ticker as a memory-mapped float view."""
+        return self._view(ticker, "prices")
+
+    def returns(self, ticker, kind="simple"):
+        """Return the stored simple or log returns of ticker as a memory-mapped float view."""
+        if kind not in RETURN_KINDS:
+            raise ValueError(f"Return kind must be one of: {', '.join(RETURN_KINDS)}")
+        view = self._view(ticker, kind)
+        # Returns written ahead of their prices are not committed yet
+        prices_path = self._path(ticker, "prices")
+        committed = os.path.getsize(prices_path) // 8 - 1 if os.path.exists(prices_path) else 0
+        return view[:max(committed, 0)]
+
+    def volatility(self, ticker):
+        """Return the volatility of ticker from its stored returns; matches calculate_volatility."""
+        return calculate_risk_metrics(self.returns(ticker))[1]
+
+    def risk_metrics(self, ticker, risk_free_rate=0.03):
+        """Return (average return, volatility, Sharpe ratio) of ticker from its stored returns."""
+        return calculate_risk_metrics(self.returns(ticker), risk_free_rate)
+
+    def close(self):
+        """Release the memory maps that no caller still holds views into."""
+        for key, (size, mapped) in list(self._maps.items()):
+            try:
+                mapped.close()
+            except BufferError:
+                # Still viewed by a caller; it is unmapped when those views are released
+                continue
+            del self._maps[key]
+
+def _derive_returns(ticker, chain):
+    """Return (simple returns, log returns) arrays between consecutive prices of chain."""
+    simple_returns = array("d")
+    log_returns = array("d")
+    for i in range(1, len(chain)):
+        if chain[i - 1] <= 0 or chain[i] <= 0:
+            raise ValueError(f"Prices for {ticker} must be positive")
+        simple_returns.append((chain[i] - chain[i - 1]) / chain[i - 1])
+        log_returns.append(math.log(chain[i] / chain[i - 1]))
+    return simple_returns, log_returns
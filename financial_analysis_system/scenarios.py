@@ -0,0 +1,92 @@
+"""
+Scenario and stress testing: price shocks applied to a shared base portfolio.
+"""
+
+SCENARIO_METRICS = ("portfolio_value", "value_change", "percent_change", "unrealized_gain")
+
+class ScenarioEngine:
+    """Evaluates many shock scenarios against one portfolio without copying it.
+
+    A scenario is a dictionary with optional "market" (a shock applied to every
+    position), "sectors" ({sector: shock}) and "tickers" ({ticker: shock}).
+    Shocks are fractional price changes, so -0.2 is a 20% drop; shocks that
+    overlap compound. Base values are aggregated per sector and ticker once, so
+    each scenario costs time proportional to the sectors and tickers it touches,
+    not to the number of positions.
+    """
+
+    def __init__(self, stocks):
+        self._sector_values = {}
+        self._ticker_values = {}
+        self._ticker_sectors = {}
+        self.cost_basis = 0
+        for stock in stocks:
+            value = stock["shares"] * stock["current_price"]
+            sector = stock["sector"]
+            ticker = stock["ticker"]
+            self._sector_values[sector] = self._sector_values.get(sector, 0) + value
+            self._ticker_values[ticker] = self._ticker_values.get(ticker, 0) + value
+            self._ticker_sectors[ticker] = sector
+            self.cost_basis += stock["shares"] * stock["purchase_price"]
+        self.sectors = list(self._sector_values)
+        self.base_value = sum(self._sector_values.values())
+        self.metrics = SCENARIO_METRICS + tuple(f"allocation:{sector}" for sector in self.sectors)
+
+    def sector_values(self, scenario):
+        """Return {sector: stressed value} for one scenario."""
+        sector_shocks = scenario.get("sectors", {})
+        values = {sector: value * (1 + sector_shocks.get(sector, 0)) for sector, value in self._sector_values.items()}
+
+        # Ticker shocks adjust only their own slice of the sector total
+        for ticker, shock in scenario.get("tickers", {}).items():
+            sector = self._ticker_sectors.get(ticker)
+            if sector is not None:
+                values[sector] += self._ticker_values[ticker] * (1 + sector_shocks.get(sector, 0)) * shock
+
+        market = 1 + scenario.get("market", 0)
+        if market != 1:
+            values = {sector: value * market for sector, value in values.items()}
+        return values
+
+    def evaluate(self, scenario):
+        """Return one row of metric values for a scenario, in the order of self.metrics."""
+        values = self.sector_values(scenario)
+        total = sum(values.values())
+        row = [
+            total,
+            total - self.base_value,
+            (total - self.base_value) / self.base_value * 100 if self.base_value else 0,
+            total - self.cost_basis
+        ]
+        row.extend(values[sector] / total * 100 if total else 0 for sector in self.sectors)
+        return row
+
+    def run(self, scenarios):
+        """Evaluate a batch of scenarios and return a scenarios x metrics result matrix.
+
+        Returns {"scenarios": names, "metrics": column names, "values": rows}.
+        Scenarios without a "name" are numbered.
+        """
+        evaluate = self.evaluate
+        return {
+            "scenarios": [scenario.get("name", f"scenario_{i}") for i, scenario in enumerate(scenarios)],
+            "metrics": list(self.metrics),
+            "values": [evaluate(scenario) for scenario in scenarios]
+        }
+
+def run_stress_test(stocks, scenarios):
+    """Evaluate scenarios against stocks. See ScenarioEngine.run for the result shape."""
+    return ScenarioEngine(stocks).run(scenarios)
+
+def generate_shock_grid(sectors, shocks=(-0.3, -0.2, -0.1, 0.1), market_shocks=(0,)):
+    """Return scenarios for every combination of a single-sector shock and a market shock."""
+    scenarios = []
+    for market in market_shocks:
+        for sector in sectors:
+            for shock in shocks:
+                scenarios.append({
+                    "name": f"market {market:+.0%}, {sector} {shock:+.0%}",
+                    "market": market,
+                    "sectors": {sector: shock}
+                })
+    return scenarios
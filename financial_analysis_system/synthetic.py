@@ -0,0 +1,159 @@
+"""
+Seeded synthetic data generators for load and performance testing.
+
+Every generator is lazy, so arbitrarily large data sets can be streamed
+without being held in memory.
+"""
+
+import csv
+import datetime
+import json
+import math
+import random
+from itertools import accumulate, islice
+
+SYNTHETIC_SECTOR_WEIGHTS = {
+    "Technology": 0.28,
+    "Healthcare": 0.13,
+    "Financial Services": 0.13,
+    "Consumer Discretionary": 0.10,
+    "Industrials": 0.09,
+    "Consumer Staples": 0.07,
+    "Communication Services": 0.06,
+    "Energy": 0.05,
+    "Utilities": 0.03,
+    "Real Estate": 0.03,
+    "Materials": 0.03
+}
+
+def generate_price_path(start_price, steps, *, drift=0.07, volatility=0.2, dt=1 / 252, seed=0):
+    """Generator yielding a geometric Brownian motion price path, starting with start_price."""
+    rng = random.Random(seed)
+    step_drift = (drift - volatility ** 2 / 2) * dt
+    step_volatility = volatility * dt ** 0.5
+
+    price = start_price
+    for _ in range(steps):
+        yield round(price, 4)
+        price *= math.exp(step_drift + step_volatility * rng.gauss(0, 1))
+
+def generate_synthetic_portfolio(count, *, seed=0, sector_weights=None):
+    """Generator yielding count stock dictionaries in the get_sample_portfolio shape."""
+    rng = random.Random(seed)
+    weights = sector_weights or SYNTHETIC_SECTOR_WEIGHTS
+    sectors = list(weights)
+    cumulative = list(accumulate(weights[sector] for sector in sectors))
+
+    for i in range(count):
+        purchase_price = round(rng.lognormvariate(4.5, 0.8), 2)
+        # Holding period of up to five years of GBM drift and noise
+        years_held = rng.uniform(0.1, 5)
+        growth = math.exp((0.07 - 0.3 ** 2 / 2) * years_held + 0.3 * years_held ** 0.5 * rng.gauss(0, 1))
+        yield {
+            "ticker": f"T{i:07d}",
+            "shares": rng.randint(1, 500),
+            "purchase_price": purchase_price,
+            "current_price": round(purchase_price * growth, 2),
+            "sector": rng.choices(sectors, cum_weights=cumulative)[0]
+        }
+
+def generate_synthetic_transactions(months, *, accounts=1, seed=0, start_date="2023-01-01"):
+    """Generator yielding dated transactions in the get_sample_transactions shape, month by month.
+
+    Each account has a monthly salary and rent, a seasonal utilities bill and a
+    number of grocery, transportation and entertainment expenses. Rows are in date
+    order within each month and carry an "account" number.
+    """
+    rng = random.Random(seed)
+    start = datetime.date.fromisoformat(start_date)
+
+    # Fixed recurring amounts per account
+    profiles = []
+    for _ in range(accounts):
+        salary = round(rng.lognormvariate(8.2, 0.35), 2)
+        profiles.append({"salary": salary, "rent": round(salary * rng.uniform(0.25, 0.4), 2),
+                         "utilities": rng.uniform(120, 260)})
+
+    for month_number in range(months):
+        year = start.year + (start.month - 1 + month_number) // 12
+        month = (start.month - 1 + month_number) % 12 + 1
+        # Utilities peak in winter and summer
+        season = 1 + 0.2 * math.cos((month - 1) * math.pi / 3)
+
+        for account, profile in enumerate(profiles):
+            rows = [
+                (5, "income", profile["salary"], "Salary"),
+                (10, "expense", profile["rent"], "Rent"),
+                (rng.randint(12, 18), "expense", round(profile["utilities"] * season * rng.uniform(0.9, 1.1), 2), "Utilities")
+            ]
+            for _ in range(4):
+                rows.append((rng.randint(1, 28), "expense", round(rng.uniform(40, 160), 2), "Groceries"))
+            for _ in range(rng.randint(1, 3)):
+                rows.append((rng.randint(1, 28), "expense", round(rng.uniform(10, 60), 2), "Transportation"))
+            for _ in range(rng.randint(0, 3)):
+                rows.append((rng.randint(1, 28), "expense", round(rng.lognormvariate(3.5, 0.7), 2), "Entertainment"))
+
+            rows.sort()
+            for day, t_type, amount, category in rows:
+                yield {
+                    "date": f"{year:04d}-{month:02d}-{day:02d}",
+                    "type": t_type,
+                    "amount": amount,
+                    "category": category,
+                    "account": account
+                }
+
+def generate_synthetic_goals(count, *, seed=0, start_date="2023-01-01"):
+    """Generator yielding count financial goals in the get_sample_financial_goals shape."""
+    rng = random.Random(seed)
+    start = datetime.date.fromisoformat(start_date)
+    names = ["Emergency Fund", "Vacation", "Down Payment", "Car", "Education", "Retirement"]
+
+    for i in range(count):
+        target_amount = round(rng.lognormvariate(9.5, 1.0), -2) or 100
+        yield {
+            "name": f"{names[i % len(names)]} {i}",
+            "target_amount": target_amount,
+            "deadline": (start + datetime.timedelta(days=rng.randint(90, 3650))).isoformat(),
+            "priority": rng.choices(["high", "medium", "low"], weights=[0.3, 0.5, 0.2])[0],
+            "current_amount": round(target_amount * rng.uniform(0, 0.9), 2)
+        }
+
+def generate_synthetic_market_data(tickers, steps, *, seed=0, risk_free_rate=0.03, market_return=0.08):
+    """Return market data in the get_sample_market_data shape with a GBM history per ticker."""
+    rng = random.Random(seed)
+    historical_prices = {}
+    for ticker in tickers:
+        historical_prices[ticker] = list(generate_price_path(
+            round(rng.lognormvariate(4.5, 0.8), 2), steps,
+            drift=rng.uniform(0.0, 0.15), volatility=rng.uniform(0.1, 0.45), seed=rng.random()))
+
+    return {
+        "risk_free_rate": risk_free_rate,
+        "market_return": market_return,
+        "volatility": 0.15,
+        "historical_prices": historical_prices
+    }
+
+def write_synthetic_rows(rows, path, *, file_format="csv", batch_size=10000):
+    """Write an iterable of row dictionaries to disk in batches. Returns the number of rows written."""
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError("File format must be 'csv' or 'jsonl'")
+
+    rows = iter(rows)
+    written = 0
+    with open(path, "w", newline="") as output:
+        writer = None
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            if file_format == "jsonl":
+                output.write("".join(json.dumps(row) + "\n" for row in batch))
+            else:
+                if writer is None:
+                    writer = csv.DictWriter(output, fieldnames=list(batch[0]))
+                    writer.writeheader()
+                writer.writerows(batch)
+            written += len(batch)
+    return written
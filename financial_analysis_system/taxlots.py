@@ -0,0 +1,170 @@
+"""
+Tax-lot holdings with FIFO, LIFO, specific-ID and average-cost relief.
+"""
+
+from collections import deque
+
+LOT_METHODS = ("fifo", "lifo", "specific", "average")
+
+# Remaining quantities smaller than this are treated as fully sold
+_DUST = 1e-9
+
+class TaxLotBook:
+    """Open lots per ticker and the gains realized by selling them.
+
+    Each ticker keeps a deque of open lots, [lot_id, date, quantity, price],
+    so FIFO and LIFO sales take lots from either end in O(1). Specific-ID
+    sales look the lot up by id. Average cost keeps one pooled lot per ticker.
+    Realized gains are accumulated per ticker rather than stored per sale, so
+    memory stays flat over millions of trades.
+    """
+
+    def __init__(self, method="fifo"):
+        if method not in LOT_METHODS:
+            raise ValueError(f"Lot method must be one of: {', '.join(LOT_METHODS)}")
+        self.method = method
+        self._lots = {}
+        self._by_id = {}
+        self._shares = {}
+        self._realized = {}
+        self._sectors = {}
+        self._next_id = 1
+
+    def buy(self, ticker, quantity, price, date=None, lot_id=None, sector=None):
+        """Open a lot (or add to the pooled lot under average cost). Returns the lot id."""
+        if quantity <= 0:
+            raise ValueError("Buy quantity must be positive")
+        if sector is not None:
+            self._sectors[ticker] = sector
+        lots = self._lots.setdefault(ticker, deque())
+        self._shares[ticker] = self._shares.get(ticker, 0) + quantity
+        if self.method == "average":
+            if lots:
+                lot = lots[0]
+                lot[3] = (lot[2] * lot[3] + quantity * price) / (lot[2] + quantity)
+                lot[2] += quantity
+                return lot[0]
+            lot_id = ticker
+        elif lot_id is None:
+            # Skip ids the caller has already given to open lots
+            while self._next_id in self._by_id:
+                self._next_id += 1
+            lot_id = self._next_id
+            self._next_id += 1
+        elif lot_id in self._by_id:
+            raise ValueError(f"Lot {lot_id!r} already exists")
+        lot = [lot_id, date, quantity, price]
+        lots.append(lot)
+        if self.method == "specific":
+            self._by_id[lot_id] = (ticker, lot)
+        return lot_id
+
+    def sell(self, ticker, quantity, price, date=None, lot_id=None):
+        """Close quantity shares against open lots. Returns the realized gain of this sale."""
+        if quantity <= 0:
+            raise ValueError("Sell quantity must be positive")
+        if self._shares.get(ticker, 0) + _DUST < quantity:
+            raise ValueError(f"Cannot sell {quantity} {ticker}: not enough shares held")
+        lots = self._lots[ticker]
+
+        if self.method == "specific":
+            if lot_id is None:
+                raise ValueError("Specific-ID sales need a lot_id")
+            owner, lot = self._by_id.get(lot_id, (None, None))
+            if owner != ticker or lot[2] + _DUST < quantity:
+                raise ValueError(f"Lot {lot_id!r} does not hold {quantity} {ticker}")
+            gain = quantity * (price - lot[3])
+            lot[2] -= quantity
+            if lot[2] <= _DUST:
+                lots.remove(lot)
+                del self._by_id[lot_id]
+        else:
+            # FIFO takes from the oldest end, LIFO (and the single average lot) from the newest
+            take_from = 0 if self.method == "fifo" else -1
+            gain = 0.0
+            remaining = quantity
+            while remaining > _DUST and lots:
+                lot = lots[take_from]
+                used = min(lot[2], remaining)
+                gain += used * (price - lot[3])
+                remaining -= used
+                lot[2] -= used
+                if lot[2] <= _DUST:
+                    if take_from == 0:
+                        lots.popleft()
+                    else:
+                        lots.pop()
+
+        self._shares[ticker] -= quantity
+        if not lots:
+            del self._lots[ticker]
+            del self._shares[ticker]
+        self._realized[ticker] = self._realized.get(ticker, 0.0) + gain
+        return gain
+
+    def process(self, trades):
+        """Apply a stream of trades in one pass. Returns the number of trades processed.
+
+        Each trade is a dictionary with ticker, quantity (negative to sell) and
+        price, and optionally date, lot_id and sector.
+        """
+        count = 0
+        buy = self.buy
+        sell = self.sell
+        for trade in trades:
+            quantity = trade["quantity"]
+            if quantity > 0:
+                buy(trade["ticker"], quantity, trade["price"], trade.get("date"), trade.get("lot_id"), trade.get("sector"))
+            elif quantity < 0:
+                sell(trade["ticker"], -quantity, trade["price"], trade.get("date"), trade.get("lot_id"))
+            count += 1
+        return count
+
+    def lots(self, ticker):
+        """Return the open lots of ticker as dictionaries, oldest first."""
+        return [{"lot_id": lot[0], "date": lot[1], "quantity": lot[2], "price": lot[3]} for lot in self._lots.get(ticker, ())]
+
+    def realized_gains(self):
+        """Return {ticker: realized gain} over every sale so far."""
+        return dict(self._realized)
+
+    def positions(self, prices=None):
+        """Return open holdings as stock dictionaries with the average cost of open lots as purchase_price.
+
+        prices maps ticker -> current price; tickers without one use the last lot price.
+        """
+        prices = prices or {}
+        positions = []
+        for ticker, lots in self._lots.items():
+            shares = self._shares[ticker]
+            cost = sum(lot[2] * lot[3] for lot in lots)
+            positions.append({
+                "ticker": ticker,
+                "shares": shares,
+                "purchase_price": cost / shares,
+                "current_price": prices.get(ticker, lots[-1][3]),
+                "sector": self._sectors.get(ticker, "Unknown")
+            })
+        return positions
+
+    def pnl_report(self, prices):
+        """Return realized, unrealized and total P&L per ticker and overall."""
+        tickers = {}
+        for stock in self.positions(prices):
+            tickers[stock["ticker"]] = {
+                "realized": self._realized.get(stock["ticker"], 0.0),
+                "unrealized": stock["shares"] * (stock["current_price"] - stock["purchase_price"])
+            }
+        for ticker, gain in self._realized.items():
+            tickers.setdefault(ticker, {"realized": gain, "unrealized": 0.0})
+        for entry in tickers.values():
+            entry["total"] = entry["realized"] + entry["unrealized"]
+        realized = sum(entry["realized"] for entry in tickers.values())
+        unrealized = sum(entry["unrealized"] for entry in tickers.values())
+        return {
+            "method": self.method,
+            "tickers": tickers,
+            "total_realized": realized,
+            "total_unrealized": unrealized,
+            "total_pnl": realized + unrealized
+        }
@@ -2,8 +2,38 @@ import pytest
 import inspect
 import sys
 import math
+import os
 from test.TestUtils import TestUtils
 from financial_analysis_system import *
+# Subsystems load lazily, so they are not part of the package's star import
+from financial_analysis_system import (
+    generate_synthetic_portfolio, generate_synthetic_transactions, generate_synthetic_goals,
+    generate_synthetic_market_data, write_synthetic_rows,
+    HoldingsIndex,
+    rank_performers, PerformanceRanking,
+    build_dated_history, slice_price_history, calculate_time_weighted_return, calculate_xirr_batch,
+    calculate_xirr, analyze_period_returns,
+    get_sample_fx_rates, get_conversion_matrix, group_values_by_currency,
+    calculate_multicurrency_value, format_currency_batch,
+    ReturnsStore,
+    SpendingAnomalyDetector,
+    QuantileSketch, calculate_percentiles, calculate_value_at_risk,
+    get_portfolio_optimizer, optimize_portfolio,
+    Ledger,
+    to_cents, sum_money,
+    SCENARIO_METRICS, ScenarioEngine, run_stress_test, generate_shock_grid,
+    backtest_profiles,
+    ComputationGraph, REPORT_NODES, run_incremental_report,
+    ColumnarTable, stock_performances_table, sector_allocation_table, sector_allocation_view,
+    projection_table, projection_view,
+    TaxLotBook,
+    detect_recurring_cash_flows, stream_recurring_cash_flows, forecast_cash_flows,
+    PerformanceCursor,
+    CompressedPriceSeries, series_volatility, series_risk_metrics,
+    run_portfolio_batch,
+    MarketDataStore,
+    main
+)
 
 class TestFunctional:
     """Enhanced test class to verify financial analysis functions match requirements"""
@@ -201,6 +231,1077 @@ class TestFunctional:
             TestUtils.yakshaAssert("TestSavingsProjectionCalculation", False, "functional")
             pytest.fail(f"Savings projection calculation test failed: {str(e)}")
     
+    def test_portfolio_batch_runner(self):
+        """Test the batch runner returns per-portfolio results in input order"""
+        try:
+            portfolio = get_sample_portfolio()
+            portfolios = [portfolio, portfolio[:2], [], portfolio[2:]]
+            
+            # Run inline and through the process pool
+            inline_results = list(run_portfolio_batch(portfolios, workers=0, chunk_size=2))
+            pool_results = list(run_portfolio_batch(portfolios, workers=2, chunk_size=1, max_pending=2))
+            
+            assert len(inline_results) == 4, "Batch should return one result per portfolio"
+            assert inline_results == pool_results, "Pool results should match inline results in order"
+            assert inline_results[0]["performance"] == analyze_portfolio_performance(portfolio), "Batch performance should match direct call"
+            assert inline_results[1]["sector_allocation"] == calculate_sector_allocation(portfolio[:2]), "Batch allocation should match direct call"
+            assert "error" in inline_results[2], "Empty portfolio should be reported as an error"
+            
+            # Shared price table overrides current prices
+            priced = list(run_portfolio_batch([portfolio], workers=1, prices={"AAPL": 200.0}))
+            assert priced[0]["performance"]["best_performer"]["ticker"] == "AAPL", "Shared prices should be used by workers"
+            
+            TestUtils.yakshaAssert("TestPortfolioBatchRunner", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestPortfolioBatchRunner", False, "functional")
+            pytest.fail(f"Portfolio batch runner test failed: {str(e)}")
+    
+    def test_shared_market_data_store(self):
+        """Test market data published to shared memory reads back with versioned swaps"""
+        try:
+            market_data = get_sample_market_data()
+            store = MarketDataStore(f"fas_test_{os.getpid()}", create=True)
+            try:
+                assert store.publish(market_data) == 1, "First publish should be version 1"
+                
+                reader = MarketDataStore(store.store_name)
+                snapshot = reader.snapshot()
+                assert snapshot["version"] == 1, "Reader should see version 1"
+                assert snapshot["risk_free_rate"] == market_data["risk_free_rate"], "Risk-free rate should round-trip"
+                assert list(snapshot["historical_prices"]["MSFT"]) == market_data["historical_prices"]["MSFT"], "Prices should round-trip"
+                assert calculate_volatility(snapshot["historical_prices"]["AAPL"]) == calculate_volatility(market_data["historical_prices"]["AAPL"]), "Shared prices should work with risk functions"
+                
+                # A new version replaces the old one for new snapshots
+                market_data["market_return"] = 0.09
+                assert store.publish(market_data) == 2, "Second publish should be version 2"
+                updated = reader.snapshot()
+                assert updated["version"] == 2 and updated["market_return"] == 0.09, "Reader should see the new version"
+                assert list(snapshot["historical_prices"]["JPM"]) == market_data["historical_prices"]["JPM"], "Old snapshot should stay readable"
+                
+                del snapshot, updated
+                reader.close()
+            finally:
+                store.close()
+            
+            TestUtils.yakshaAssert("TestSharedMarketDataStore", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestSharedMarketDataStore", False, "functional")
+            pytest.fail(f"Shared market data store test failed: {str(e)}")
+    
+    def test_benchmark_suite(self):
+        """Test the benchmark suite produces comparable machine-readable results"""
+        try:
+            import financial_analysis_system as fas
+            from benchmarks.bench_financial_analysis import BENCHMARKS, run_suite, compare_to_baseline, scale_portfolio
+            
+            public_functions = {name for name in fas.__all__ if not name.startswith("get_sample_")}
+            assert public_functions <= set(BENCHMARKS), f"Unbenchmarked functions: {sorted(public_functions - set(BENCHMARKS))}"
+            
+            # Synthetic data keeps the sample shape at any size
+            portfolio = scale_portfolio(12)
+            assert len(portfolio) == 12, "Scaled portfolio should have the requested rows"
+            assert set(portfolio[0]) == set(get_sample_portfolio()[0]), "Scaled rows should keep the sample fields"
+            
+            results = run_suite([10, 20], functions=["calculate_volatility", "categorize_transactions"], repeats=2)
+            assert len(results["results"]) == 4, "Should produce one result per function and size"
+            for result in results["results"]:
+                assert result["p50_seconds"] <= result["p99_seconds"], "Percentiles should be ordered"
+                assert result["peak_memory_bytes"] >= 0, "Peak memory should be recorded"
+            
+            # A baseline twice as fast flags every entry as a regression
+            faster = {"results": [dict(r, p50_seconds=r["p50_seconds"] / 2) for r in results["results"]]}
+            assert compare_to_baseline(results, results) == [], "Identical results should not regress"
+            assert len(compare_to_baseline(results, faster)) == 4, "Slower results should be reported"
+            
+            TestUtils.yakshaAssert("TestBenchmarkSuite", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestBenchmarkSuite", False, "functional")
+            pytest.fail(f"Benchmark suite test failed: {str(e)}")
+    
+    def test_instrumentation_and_profiling(self):
+        """Test opt-in instrumentation records calls and restores the original functions"""
+        try:
+            import financial_analysis_system as fas
+            
+            original = fas.calculate_portfolio_value
+            events = []
+            fas.reset_instrumentation()
+            fas.enable_instrumentation(callback=lambda name, seconds, size: events.append((name, size)))
+            try:
+                portfolio = get_sample_portfolio()
+                fas.analyze_portfolio_performance(portfolio)
+                fas.categorize_transactions(*get_sample_transactions())
+                list(fas.monthly_performance_generator({"Jan": 100, "Feb": 110}))
+            finally:
+                fas.disable_instrumentation()
+            
+            assert fas.calculate_portfolio_value is original, "Disabling should restore the original functions"
+            stats = fas.get_instrumentation_stats()
+            assert stats["analyze_portfolio_performance"]["calls"] == 1, "Performance analysis should be counted once"
+            assert stats["calculate_portfolio_value"]["calls"] == 1, "Nested calls should be counted"
+            assert stats["calculate_stock_performance"]["calls"] == len(portfolio), "Per-stock performance should be counted"
+            public_functions = {name for name in fas.__all__ if not name.startswith("get_sample_")}
+            assert public_functions <= set(fas.INSTRUMENTED_FUNCTIONS), "Every public function should be instrumented"
+            assert stats["categorize_transactions"]["max_input_size"] == 10, "Input size should count *args transactions"
+            assert ("monthly_performance_generator", 2) in events, "Callback should receive generator calls"
+            
+            metrics = fas.export_prometheus_metrics()
+            assert 'financial_analysis_calls_total{function="categorize_transactions"} 1' in metrics, "Prometheus text should include call counts"
+            
+            with fas.profile_block("cprofile") as profile:
+                calculate_sector_allocation(portfolio)
+            assert profile["stats"].total_calls > 0, "cProfile mode should record calls"
+            
+            with fas.profile_block("sampling", interval=0.001) as profile:
+                pass
+            assert isinstance(profile["samples"], dict), "Sampling mode should return sample counts"
+            
+            fas.reset_instrumentation()
+            TestUtils.yakshaAssert("TestInstrumentationAndProfiling", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestInstrumentationAndProfiling", False, "functional")
+            pytest.fail(f"Instrumentation test failed: {str(e)}")
+    
+    def test_synthetic_data_generators(self):
+        """Test the seeded synthetic generators produce sample-shaped, reproducible data"""
+        try:
+            portfolio = list(generate_synthetic_portfolio(50, seed=7))
+            assert len(portfolio) == 50, "Should generate the requested number of stocks"
+            assert portfolio == list(generate_synthetic_portfolio(50, seed=7)), "Same seed should give the same data"
+            assert set(portfolio[0]) == set(get_sample_portfolio()[0]), "Stocks should have the sample fields"
+            assert calculate_portfolio_value(portfolio) > 0, "Synthetic portfolio should have positive value"
+            
+            transactions = list(generate_synthetic_transactions(3, accounts=2, seed=7))
+            salaries = [t for t in transactions if t["category"] == "Salary"]
+            assert len(salaries) == 6, "Each account should be paid once a month"
+            assert all(t["date"][8:] == "05" for t in salaries), "Salary should recur on the same day"
+            assert categorize_transactions(*transactions)["total_income"] > 0, "Transactions should categorize"
+            
+            goals = list(generate_synthetic_goals(5, seed=7))
+            assert all(g["current_amount"] < g["target_amount"] for g in goals), "Goals should be partly funded"
+            
+            market_data = generate_synthetic_market_data(["AAA", "BBB"], 30, seed=7)
+            assert len(market_data["historical_prices"]["AAA"]) == 30, "Price paths should have the requested length"
+            assert all(price > 0 for price in market_data["historical_prices"]["BBB"]), "GBM prices should stay positive"
+            
+            path = os.path.join(os.path.dirname(__file__), "synthetic_rows.jsonl")
+            try:
+                written = write_synthetic_rows(generate_synthetic_portfolio(25), path, file_format="jsonl", batch_size=10)
+                assert written == 25, "Should write every generated row"
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+            
+            TestUtils.yakshaAssert("TestSyntheticDataGenerators", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestSyntheticDataGenerators", False, "functional")
+            pytest.fail(f"Synthetic data generator test failed: {str(e)}")
+    
+    def test_period_return_engine(self):
+        """Test time-weighted and money-weighted returns over dated price histories"""
+        try:
+            # Simple XIRR: 10% over exactly one year
+            assert round(calculate_xirr([("2023-01-01", -1000), ("2024-01-01", 1100)]), 6) == 0.1, "XIRR should be 10%"
+            rates = calculate_xirr_batch([
+                [("2023-01-01", -1000), ("2024-01-01", 1100)],
+                [("2023-01-01", -100), ("2023-06-01", -100), ("2024-01-01", 150)],
+                [("2023-01-01", 100)]
+            ])
+            assert round(rates[0], 6) == 0.1, "Batch XIRR should match single XIRR"
+            assert rates[1] < 0, "Losing account should have negative XIRR"
+            assert rates[2] is None, "Flows of one sign have no XIRR"
+            
+            # TWR removes the effect of a contribution
+            valuations = [("2023-01-01", 100), ("2023-02-01", 210), ("2023-03-01", 231)]
+            twr = calculate_time_weighted_return(valuations, {"2023-02-01": 100})
+            assert round(twr, 6) == round(1.1 * 1.1 - 1, 6), "TWR should chain sub-period returns"
+            
+            # Periods slice the dated history by binary search
+            market_data = get_sample_market_data()
+            history = {ticker: build_dated_history(prices, "2023-12-31", step_days=30)
+                       for ticker, prices in market_data["historical_prices"].items()}
+            assert len(slice_price_history(history["AAPL"], "1m")) == 2, "One month should hold two monthly prices"
+            assert len(slice_price_history(history["AAPL"], "1y")) == 7, "One year should hold all prices"
+            
+            portfolio = get_sample_portfolio()
+            one_month = analyze_portfolio_performance(portfolio, period="1m", price_history=history)["period_returns"]
+            one_year = analyze_portfolio_performance(portfolio, period="1y", price_history=history)["period_returns"]
+            assert one_month["time_weighted_return"] != one_year["time_weighted_return"], "Returns should depend on the period"
+            expected = one_year["end_value"] / one_year["start_value"] - 1
+            assert round(one_year["time_weighted_return"], 6) == round(expected, 6), "Without flows TWR is the value change"
+            assert round(one_month["stock_returns"]["AAPL"], 6) == round(175 / 165 - 1, 6), "Stock return should use the period window"
+            
+            # Histories that do not line up share one window and carry prices forward
+            flat_a = [(f"2023-{month:02d}-01", 100) for month in range(6, 13)] + [("2023-12-31", 100)]
+            flat_b = [("2023-06-01", 100), ("2023-06-30", 100)]
+            stocks = [{"ticker": "A", "shares": 10}, {"ticker": "B", "shares": 10}]
+            misaligned = analyze_period_returns(stocks, {"A": flat_a, "B": flat_b}, "1m")
+            assert (misaligned["start_date"], misaligned["end_date"]) == ("2023-12-01", "2023-12-31"), "Window should end on the latest date"
+            assert misaligned["start_value"] == misaligned["end_value"] == 2000, "Stale tickers should keep their last price"
+            assert misaligned["time_weighted_return"] == 0, "Flat prices should not show a return"
+            offset = analyze_period_returns(stocks, {"A": build_dated_history([100] * 10, "2023-12-31"),
+                                                     "B": build_dated_history([100] * 9, "2023-12-31")}, "1m")
+            assert offset["start_date"] == "2023-12-23", "Window should start once every ticker has a price"
+            assert offset["time_weighted_return"] == 0, "Offset histories should not show a return"
+            
+            TestUtils.yakshaAssert("TestPeriodReturnEngine", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestPeriodReturnEngine", False, "functional")
+            pytest.fail(f"Period return engine test failed: {str(e)}")
+    
+    def test_multicurrency_valuation(self):
+        """Test currency-aware valuation and formatting"""
+        try:
+            fx_rates = get_sample_fx_rates()
+            portfolio = get_sample_portfolio()
+            portfolio[0] = dict(portfolio[0], currency="EUR")
+            portfolio[1] = dict(portfolio[1], currency="JPY", current_price=40000)
+            
+            groups = group_values_by_currency(portfolio)
+            assert groups["EUR"] == 1750.0, "EUR group should hold the AAPL position"
+            assert groups["USD"] == calculate_portfolio_value(portfolio[2:]), "Positions without currency are USD"
+            
+            valuation = calculate_multicurrency_value(portfolio, fx_rates, target_currency="USD")
+            expected = 1750.0 * 1.08 + 200000 * 0.0067 + groups["USD"]
+            assert round(valuation["total_value"], 6) == round(expected, 6), "Total should convert each currency group"
+            
+            matrix = get_conversion_matrix(fx_rates)
+            assert matrix is get_conversion_matrix(dict(fx_rates)), "Conversion matrix should be cached per rate table"
+            assert round(matrix["EUR"]["GBP"] * matrix["GBP"]["EUR"], 9) == 1, "Conversions should be reciprocal"
+            
+            try:
+                calculate_multicurrency_value([dict(portfolio[0], currency="XYZ")], fx_rates)
+                assert False, "Missing FX rate should raise ValueError"
+            except ValueError:
+                pass
+            
+            assert format_currency(1234.5) == "$1,234.50", "USD formatting should be unchanged"
+            assert format_currency(1234.5, "JPY") == "¥1,234", "JPY should have no decimals"
+            assert format_currency_batch([1, 1000.456], "EUR") == ["€1.00", "€1,000.46"], "Batch formatting should use the symbol"
+            
+            TestUtils.yakshaAssert("TestMulticurrencyValuation", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestMulticurrencyValuation", False, "functional")
+            pytest.fail(f"Multi-currency valuation test failed: {str(e)}")
+    
+    def test_holdings_index(self):
+        """Test ticker lookups, point updates and per-sector views of indexed holdings"""
+        try:
+            holdings = HoldingsIndex(get_sample_portfolio())
+            assert len(holdings) == 5 and "MSFT" in holdings, "Index should hold every ticker"
+            assert holdings.get("JNJ")["sector"] == "Healthcare", "Lookup by ticker should return the stock"
+            assert holdings.sector_allocation() == calculate_sector_allocation(get_sample_portfolio()), "Allocation should match the list version"
+            
+            # Partial upserts, moves between sectors and deletes
+            holdings.upsert([
+                {"ticker": "AAPL", "current_price": 200.0},
+                {"ticker": "XOM", "shares": 4, "purchase_price": 100.0, "current_price": 110.0, "sector": "Energy"},
+                {"ticker": "PG", "sector": "Healthcare"}
+            ])
+            holdings.update_price("JPM", 160.0)
+            assert holdings.get("AAPL")["shares"] == 10, "Partial update should keep other fields"
+            assert sorted(s["ticker"] for s in holdings.sector_view("Healthcare")) == ["JNJ", "PG"], "Sector change should move the stock"
+            assert "Consumer Staples" not in holdings.sectors(), "Empty sectors should be removed"
+            assert holdings.sector_allocation()["sectors"] == calculate_sector_allocation(holdings.stocks())["sectors"], "Allocation should follow updates"
+            assert holdings.sector_value("Energy") == 440.0, "Sector value should include the new holding"
+            holdings.get("XOM")["current_price"] = 0
+            holdings.sector_view("Energy")[0]["shares"] = 0
+            assert holdings.sector_value("Energy") == 440.0, "Mutating a returned holding should not change the index"
+            
+            assert holdings.delete(["XOM", "UNKNOWN"]) == 1, "Delete should skip unknown tickers"
+            assert "Energy" not in holdings.sectors(), "Deleting the last holding should drop the sector"
+            
+            try:
+                holdings.upsert([{"ticker": "NEW", "shares": 1}])
+                assert False, "Incomplete new holding should raise ValueError"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("TestHoldingsIndex", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestHoldingsIndex", False, "functional")
+            pytest.fail(f"Holdings index test failed: {str(e)}")
+    
+    def test_performance_ranking(self):
+        """Test top and bottom performer queries and incremental re-ranking"""
+        try:
+            portfolio = get_sample_portfolio()
+            performance = analyze_portfolio_performance(portfolio)
+            
+            top = rank_performers(portfolio, 2)
+            assert top[0] == performance["best_performer"], "Top performer should match the best performer"
+            assert [p["ticker"] for p in top] == ["AAPL", "JPM"], "Top two by percent change should be AAPL and JPM"
+            assert rank_performers(portfolio, 1, bottom=True)[0] == performance["worst_performer"], "Bottom should match the worst performer"
+            assert [p["ticker"] for p in rank_performers(portfolio, 5, by="dollar_change", sector="Technology")] == ["AAPL", "MSFT"], "Sector filter should limit results"
+            assert rank_performers(portfolio, 0) == [], "Zero results requested should return an empty list"
+            
+            ranking = PerformanceRanking(portfolio)
+            assert ranking.top(2) == top, "Incremental ranking should match partial selection"
+            
+            # A price tick moves only the updated ticker
+            ranking.update_price("JNJ", 400.0)
+            assert ranking.top(1)[0]["ticker"] == "JNJ", "Updated ticker should move to the top"
+            assert ranking.bottom(1)[0]["ticker"] == "PG", "Next worst performer should be at the bottom"
+            assert ranking.top(1, sector="Healthcare")[0]["ticker"] == "JNJ", "Sector ranking should be updated"
+            
+            ranking.remove("JNJ")
+            assert ranking.top(1, sector="Healthcare") == [], "Removed ticker should leave an empty sector"
+            
+            TestUtils.yakshaAssert("TestPerformanceRanking", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestPerformanceRanking", False, "functional")
+            pytest.fail(f"Performance ranking test failed: {str(e)}")
+    
+    def test_command_line_entry_point(self):
+        """Test the command-line batch commands read input files and write results"""
+        try:
+            import json
+            import tempfile
+            
+            with tempfile.TemporaryDirectory() as directory:
+                portfolios_path = os.path.join(directory, "portfolios.jsonl")
+                with open(portfolios_path, "w") as portfolios_file:
+                    for _ in range(3):
+                        portfolios_file.write(json.dumps(get_sample_portfolio()) + "\n")
+                
+                output_path = os.path.join(directory, "portfolio_results.jsonl")
+                exit_code = main(["portfolio", portfolios_path, "--workers", "0", "--chunk-size", "2",
+                                  "--output", output_path, "--quiet"])
+                assert exit_code == 0, "Portfolio command should succeed"
+                with open(output_path) as output_file:
+                    results = [json.loads(line) for line in output_file]
+                assert len(results) == 3, "Should write one result per portfolio"
+                assert results[0]["performance"]["total_gain_loss"] == analyze_portfolio_performance(get_sample_portfolio())["total_gain_loss"], "Results should match the library"
+                
+                transactions_path = os.path.join(directory, "transactions.csv")
+                write_synthetic_rows(get_sample_transactions(), transactions_path)
+                budget_path = os.path.join(directory, "budget.json")
+                main(["budget", transactions_path, "--format", "json", "--chunk-size", "3",
+                      "--output", budget_path, "--quiet"])
+                with open(budget_path) as budget_file:
+                    budget = json.load(budget_file)[0]
+                expected = categorize_transactions(*get_sample_transactions())
+                assert budget["total_income"] == expected["total_income"], "Chunked budget income should match"
+                assert round(budget["expense"]["Rent"], 2) == expected["expense"]["Rent"], "Chunked categories should match"
+                
+                risk_input = os.path.join(directory, "market.json")
+                with open(risk_input, "w") as market_file:
+                    json.dump(get_sample_market_data(), market_file)
+                risk_path = os.path.join(directory, "risk.csv")
+                main(["risk", risk_input, "--format", "csv", "--output", risk_path, "--quiet"])
+                with open(risk_path) as risk_file:
+                    assert len(risk_file.read().strip().splitlines()) == 6, "Risk CSV should have a header and one row per ticker"
+                
+                # Bad arguments and unreadable input fail with a message, not a traceback
+                try:
+                    main(["budget", transactions_path, "--chunk-size", "0", "--quiet"])
+                    assert False, "A chunk size of 0 should be rejected"
+                except SystemExit as exit_error:
+                    assert exit_error.code == 2, "argparse should reject the chunk size"
+                missing_path = os.path.join(directory, "missing.csv")
+                assert main(["budget", missing_path, "--output", budget_path, "--quiet"]) == 1, "Missing input should exit non-zero"
+                with open(risk_input, "w") as market_file:
+                    market_file.write("{not json")
+                assert main(["risk", risk_input, "--output", risk_path, "--quiet"]) == 1, "Malformed input should exit non-zero"
+            
+            TestUtils.yakshaAssert("TestCommandLineEntryPoint", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestCommandLineEntryPoint", False, "functional")
+            pytest.fail(f"Command-line entry point test failed: {str(e)}")
+    
+    def test_lazy_package_imports(self):
+        """Test the package loads subsystems only on first attribute access"""
+        try:
+            import subprocess
+            
+            script = (
+                "import sys, financial_analysis_system as fas\n"
+                "print(','.join(m for m in sys.modules if m.startswith('financial_analysis_system.')))\n"
+                "fas.rank_performers\n"
+                "print(','.join(m for m in sys.modules if m.startswith('financial_analysis_system.')))\n"
+                "print('multiprocessing' in sys.modules)\n"
+                "exec('from financial_analysis_system import *')\n"
+                "print('decimal' in sys.modules or 'financial_analysis_system.batch' in sys.modules)\n"
+            )
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True)
+            before, after, multiprocessing_loaded, star_loaded = result.stdout.splitlines()
+            
+            assert "financial_analysis_system.ranking" not in before.split(","), "Ranking should not load with the package"
+            assert "financial_analysis_system.ranking" in after.split(","), "Ranking should load on first access"
+            assert multiprocessing_loaded == "False", "The process pool should not load with the package"
+            assert star_loaded == "False", "A star import should not load the subsystems"
+            
+            import financial_analysis_system as fas
+            assert "run_portfolio_batch" in dir(fas), "Lazy names should be listed by dir()"
+            try:
+                fas.no_such_function
+                assert False, "Unknown names should raise AttributeError"
+            except AttributeError:
+                pass
+            
+            TestUtils.yakshaAssert("TestLazyPackageImports", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestLazyPackageImports", False, "functional")
+            pytest.fail(f"Lazy package import test failed: {str(e)}")
+    
+    def test_returns_store(self):
+        """Test precomputed returns are stored once and extended incrementally"""
+        try:
+            import tempfile
+            
+            market_data = get_sample_market_data()
+            with tempfile.TemporaryDirectory() as directory:
+                store = ReturnsStore(directory)
+                
+                # Load the first half, then append the rest
+                first_half = {ticker: prices[:4] for ticker, prices in market_data["historical_prices"].items()}
+                store.load_market_data({"historical_prices": first_half})
+                assert len(store.returns("AAPL")) == 3, "Four prices should give three returns"
+                for ticker, prices in market_data["historical_prices"].items():
+                    assert store.append_prices(ticker, prices[4:]) == 3, "Appending should add one return per new price"
+                
+                assert store.tickers() == sorted(market_data["historical_prices"]), "Every ticker should be stored"
+                assert list(store.prices("MSFT")) == market_data["historical_prices"]["MSFT"], "Prices should round-trip"
+                for ticker, prices in market_data["historical_prices"].items():
+                    assert round(store.volatility(ticker), 12) == round(calculate_volatility(prices), 12), f"{ticker} volatility should match"
+                
+                simple = store.returns("PG")
+                assert round(simple[0], 12) == round((140 - 138) / 138, 12), "Simple return should be stored"
+                assert round(store.returns("PG", "log")[0], 12) == round(math.log(140 / 138), 12), "Log return should be stored"
+                assert store.risk_metrics("JPM", 0.01) == calculate_risk_metrics(list(store.returns("JPM")), 0.01), "Risk metrics should use stored returns"
+                
+                try:
+                    store.returns("UNKNOWN")
+                    assert False, "Unknown ticker should raise KeyError"
+                except KeyError:
+                    pass
+                del simple
+                store.close()
+            
+            TestUtils.yakshaAssert("TestReturnsStore", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestReturnsStore", False, "functional")
+            pytest.fail(f"Returns store test failed: {str(e)}")
+    
+    def test_spending_anomaly_detector(self):
+        """Test the streaming detector flags a utilities bill far above normal"""
+        try:
+            detector = SpendingAnomalyDetector(threshold=3.0, warmup=3)
+            history = [
+                {"date": f"2023-{month:02d}-15", "type": "expense", "amount": amount, "category": "Utilities"}
+                for month, amount in enumerate([200.0, 180.0, 190.0, 210.0, 195.0, 205.0], start=1)
+            ]
+            history.append({"date": "2023-07-05", "type": "income", "amount": 90000.0, "category": "Salary"})
+            assert list(detector.process(history)) == [], "Normal bills and income should not be flagged"
+            
+            stats = detector.category_stats("Utilities")
+            assert stats["count"] == 6, "Running statistics should count each bill"
+            assert 180 < stats["mean"] < 210, "Running mean should track typical bills"
+            
+            spike = {"date": "2023-08-15", "type": "expense", "amount": 650.0, "category": "Utilities"}
+            anomaly = detector.update(spike)
+            assert anomaly is not None, "A bill far above normal should be flagged"
+            assert anomaly["z_score"] > 3, "Flagged bill should be more than three deviations above normal"
+            assert anomaly["category"] == "Utilities", "Anomaly should name its category"
+            
+            # Categories and accounts are tracked separately
+            assert detector.category_stats("Utilities", account=1)["count"] == 0, "Other accounts should have their own statistics"
+            
+            TestUtils.yakshaAssert("TestSpendingAnomalyDetector", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestSpendingAnomalyDetector", False, "functional")
+            pytest.fail(f"Spending anomaly detector test failed: {str(e)}")
+    
+    def test_value_at_risk_and_quantile_sketch(self):
+        """Test exact, parametric and sketch VaR agree and sketches merge across chunks"""
+        try:
+            returns = [((i * 37) % 101 - 50) / 1000 for i in range(2000)]
+            var, cvar = calculate_value_at_risk(returns, 0.95)
+            worst = sorted(returns)[:100]
+            assert var == -worst[-1], "Historical VaR should be the 5th percentile loss"
+            assert round(cvar, 12) == round(-sum(worst) / 100, 12), "Historical CVaR should average the tail"
+            assert cvar >= var, "Expected shortfall should not be below VaR"
+            
+            avg_return, volatility, _ = calculate_risk_metrics(returns, 0)
+            p_var, p_cvar = calculate_value_at_risk(returns, 0.95, method="parametric")
+            assert round(p_var, 12) == round(1.6448536269514722 * volatility - avg_return, 12), "Parametric VaR should use the normal quantile"
+            assert p_cvar > p_var, "Parametric CVaR should exceed VaR"
+            
+            # Sketches built on separate chunks merge into one distribution
+            chunks = [QuantileSketch(100, seed=i) for i in range(4)]
+            for i, sketch in enumerate(chunks):
+                sketch.extend(returns[i::4])
+            merged = QuantileSketch.from_dict(chunks[0].to_dict())
+            for sketch in chunks[1:]:
+                merged.merge(sketch)
+            assert merged.count == len(returns), "Merged sketch should count every return"
+            s_var, s_cvar = calculate_value_at_risk(merged, 0.95)
+            assert abs(s_var - var) <= 0.005, "Sketch VaR should be close to the exact value"
+            assert abs(s_cvar - cvar) <= 0.005, "Sketch CVaR should be close to the exact value"
+            
+            assert calculate_percentiles(returns, 0, 50, 100) == (-0.05, sorted(returns)[999], 0.05), "Exact percentiles should use nearest rank"
+            assert calculate_value_at_risk([]) == (0, 0), "Empty returns should give zero risk"
+            
+            TestUtils.yakshaAssert("TestValueAtRiskAndQuantileSketch", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestValueAtRiskAndQuantileSketch", False, "functional")
+            pytest.fail(f"Value at risk test failed: {str(e)}")
+    
+    def test_portfolio_optimizer(self):
+        """Test the efficient frontier and max-Sharpe portfolio from sample market data"""
+        try:
+            market_data = get_sample_market_data()
+            result = optimize_portfolio(market_data, 10, periods_per_year=12)
+            assert set(result["tickers"]) == set(market_data["historical_prices"]), "Every asset should be optimized"
+            frontier = result["frontier"]
+            assert len(frontier) == 10, "Frontier should have the requested number of points"
+            for point in frontier:
+                assert round(sum(point["weights"].values()), 9) == 1, "Frontier weights should be fully invested"
+            assert all(a["volatility"] <= b["volatility"] + 1e-12 for a, b in zip(frontier, frontier[1:])), "Risk should rise along the frontier"
+            assert round(frontier[0]["volatility"], 12) == round(result["min_variance"]["volatility"], 12), "Frontier should start at minimum variance"
+            
+            optimizer = get_portfolio_optimizer(market_data["historical_prices"])
+            assert optimizer is get_portfolio_optimizer(market_data["historical_prices"]), "Optimizer and factorization should be cached"
+            best = result["max_sharpe"]
+            avg_return, volatility, sharpe = optimizer.portfolio_risk_metrics(best["weights"], result["risk_free_rate"])
+            assert round(volatility, 12) == round(best["volatility"], 12), "Volatility should match calculate_risk_metrics"
+            assert round(sharpe, 6) == round(best["sharpe_ratio"], 6), "Sharpe ratio should match calculate_risk_metrics"
+            assert all(point["sharpe_ratio"] <= best["sharpe_ratio"] + 1e-9 for point in frontier), "No frontier point should beat max Sharpe"
+            
+            assert "error" in optimizer.max_sharpe(1.0), "A risk-free rate above every return has no tangency portfolio"
+            assert "error" in optimize_portfolio({"historical_prices": {"A": [1, 2], "B": [1, 2, 3]}}), "Mismatched histories should be rejected"
+            
+            TestUtils.yakshaAssert("TestPortfolioOptimizer", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestPortfolioOptimizer", False, "functional")
+            pytest.fail(f"Portfolio optimizer test failed: {str(e)}")
+    
+    def test_event_ledger(self):
+        """Test the ledger replays to any point from snapshots and survives a torn write"""
+        try:
+            import json
+            import tempfile
+            
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "ledger.bin")
+                with Ledger(path, snapshot_interval=4, sync_every=3) as ledger:
+                    for stock in get_sample_portfolio():
+                        ledger.record_trade("2023-01-02", stock["ticker"], stock["shares"], stock["purchase_price"], stock["sector"])
+                    ledger.record_transactions(get_sample_transactions())
+                    for stock in get_sample_portfolio():
+                        ledger.record_price("2023-03-01", stock["ticker"], stock["current_price"])
+                    
+                    assert len(ledger) == 20, "Every event should be counted"
+                    assert calculate_portfolio_value(ledger.positions()) == calculate_portfolio_value(get_sample_portfolio()), "Positions should value like the sample portfolio"
+                    assert ledger.cash_flow_summary() == categorize_transactions(*get_sample_transactions()), "Cash flows should summarize like categorize_transactions"
+                    assert calculate_portfolio_value(ledger.positions(5)) == 6620.0, "Replay to the trades should use purchase prices"
+                    history = [ledger.state_at(sequence) for sequence in range(21)]
+                    assert history[0]["positions"] == {}, "Replay to the start should be empty"
+                
+                # A partial record at the end of the log and a torn snapshot line are discarded on reopen
+                with open(path, "ab") as log:
+                    log.write(b"\x01\x02")
+                with open(path + ".snapshots", "a") as snapshot_file:
+                    snapshot_file.write('{"sequence": 24, "off')
+                with Ledger(path, snapshot_interval=4, sync_every=3) as ledger:
+                    assert all(ledger.state_at(sequence) == history[sequence] for sequence in range(21)), "Reopened ledger should replay identically"
+                    ledger.record_trade("2023-03-02", "AAPL", -4, 180.0)
+                    aapl = [stock for stock in ledger.positions() if stock["ticker"] == "AAPL"][0]
+                    assert aapl["shares"] == 6 and aapl["purchase_price"] == 150.0, "Sales should keep the average cost"
+                    assert len(list(ledger.events(20))) == 1, "Events should be readable from the log"
+                    for ticker in ("MSFT", "JNJ", "PG"):
+                        ledger.record_price("2023-03-03", ticker, 100.0)
+                with open(path + ".snapshots") as snapshot_file:
+                    snapshots = [json.loads(line) for line in snapshot_file]
+                assert snapshots[-1]["sequence"] == 24, "New snapshots should be readable after a torn one"
+                
+                # A snapshot taken straight after recovering a torn log records the true end
+                with open(path, "ab") as log:
+                    log.write(b"\x02\x03\x04")
+                with Ledger(path, snapshot_interval=100, sync_every=3) as ledger:
+                    ledger.snapshot()
+                    ledger.record_price("2023-03-04", "AAPL", 190.0)
+                    expected_state = ledger.state_at()
+                with Ledger(path, snapshot_interval=100, sync_every=3) as ledger:
+                    assert len(ledger) == 25, "Events after the snapshot should replay on reopen"
+                    assert ledger.state_at() == expected_state, "Reopened state should include the new event"
+            
+            TestUtils.yakshaAssert("TestEventLedger", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestEventLedger", False, "functional")
+            pytest.fail(f"Event ledger test failed: {str(e)}")
+    
+    def test_exact_numeric_mode(self):
+        """Test exact integer-cents mode matches float mode to the cent on sample data"""
+        try:
+            from decimal import Decimal
+            
+            portfolio = get_sample_portfolio()
+            transactions = get_sample_transactions()
+            float_value = calculate_portfolio_value(portfolio)
+            float_categories = categorize_transactions(*transactions)
+            float_projection = generate_savings_projection(5000, 3500, 3, savings_rate=0.25)
+            
+            exact_value = calculate_portfolio_value(portfolio, numeric_mode="exact")
+            exact_categories = categorize_transactions(*transactions, numeric_mode="exact")
+            exact_projection = generate_savings_projection(5000, 3500, 3, savings_rate=0.25, numeric_mode="exact")
+            
+            assert exact_value == Decimal("7180.00"), "Exact portfolio value should be a two-place Decimal"
+            assert round(float_value, 2) == float(exact_value), "Portfolio value should match to the cent"
+            for key in ("total_income", "total_expenses", "net_cashflow"):
+                assert round(float_categories[key], 2) == float(exact_categories[key]), f"{key} should match to the cent"
+            for category, amount in float_categories["expense"].items():
+                assert round(amount, 2) == float(exact_categories["expense"][category]), f"{category} should match to the cent"
+            assert float(exact_projection["yearly_projection"][3]["cumulative_savings"]) == round(float_projection["yearly_projection"][3]["cumulative_savings"], 2), "Projection should match to the cent"
+            
+            assert sum_money([0.1] * 10) == Decimal("1.00"), "Exact sums should not drift"
+            assert to_cents(1.005) == 101 and to_cents(-2.675) == -268, "Half cents should round away from zero"
+            
+            # Whole-portfolio analysis and the batch runner work in exact mode too
+            float_performance = analyze_portfolio_performance(portfolio)
+            exact_performance = analyze_portfolio_performance(portfolio, numeric_mode="exact")
+            assert exact_performance["total_gain_loss"] == Decimal("560.00"), "Exact gain should be a two-place Decimal"
+            assert round(float_performance["total_gain_loss"], 2) == float(exact_performance["total_gain_loss"]), "Gain should match to the cent"
+            assert round(exact_performance["percent_gain_loss"], 9) == round(float_performance["percent_gain_loss"], 9), "Percent gain should match"
+            batch = list(run_portfolio_batch([portfolio, portfolio[:2]], workers=0, numeric_mode="exact"))
+            assert "error" not in batch[0] and batch[0]["performance"] == exact_performance, "Batch should analyze in exact mode"
+            try:
+                calculate_portfolio_value(portfolio, numeric_mode="decimal")
+                assert False, "Unknown numeric modes should raise ValueError"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("TestExactNumericMode", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestExactNumericMode", False, "functional")
+            pytest.fail(f"Exact numeric mode test failed: {str(e)}")
+    
+    def test_scenario_engine(self):
+        """Test stress scenarios match hand-shocked portfolios without modifying the base"""
+        try:
+            portfolio = get_sample_portfolio()
+            scenario = {"name": "tech selloff", "market": -0.1, "sectors": {"Technology": -0.2}, "tickers": {"AAPL": -0.3}}
+            result = run_stress_test(portfolio, [scenario, {}])
+            assert result["scenarios"] == ["tech selloff", "scenario_1"], "Scenarios should be named in order"
+            assert result["metrics"][:4] == list(SCENARIO_METRICS), "Core metrics should lead the columns"
+            assert len(result["values"]) == 2 and len(result["values"][0]) == len(result["metrics"]), "Result should be a scenarios x metrics matrix"
+            
+            # The same shocks applied by hand
+            multipliers = {"AAPL": 0.9 * 0.8 * 0.7, "MSFT": 0.9 * 0.8}
+            shocked = [dict(stock, current_price=stock["current_price"] * multipliers.get(stock["ticker"], 0.9)) for stock in portfolio]
+            row = dict(zip(result["metrics"], result["values"][0]))
+            assert round(row["portfolio_value"], 6) == round(calculate_portfolio_value(shocked), 6), "Stressed value should match"
+            allocation = calculate_sector_allocation(shocked)["sectors"]["Technology"]["percentage"]
+            assert round(row["allocation:Technology"], 6) == round(allocation, 6), "Stressed allocation should match"
+            
+            unchanged = dict(zip(result["metrics"], result["values"][1]))
+            assert unchanged["value_change"] == 0, "An empty scenario should leave the value unchanged"
+            assert portfolio == get_sample_portfolio(), "The base portfolio should not be modified"
+            
+            grid = generate_shock_grid(["Technology", "Healthcare"], shocks=(-0.2, 0.1), market_shocks=(0, -0.1))
+            assert len(ScenarioEngine(portfolio).run(grid)["values"]) == 8, "The grid should cover every combination"
+            
+            TestUtils.yakshaAssert("TestScenarioEngine", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestScenarioEngine", False, "functional")
+            pytest.fail(f"Scenario engine test failed: {str(e)}")
+    
+    def test_backtest_profiles(self):
+        """Test the profile backtest grid against a hand-computed buy-and-hold run"""
+        try:
+            market_data = {
+                "risk_free_rate": 0.0,
+                "historical_prices": {"AAA": [100, 110, 99, 120], "BBB": [50, 50, 50, 60]}
+            }
+            results = backtest_profiles(market_data, rebalance_every=(1, 0), periods_per_year=3)
+            assert len(results) == 6, "There should be one result per profile and frequency"
+            assert [r["profile"] for r in results[::2]] == ["conservative", "moderate", "aggressive"], "Profiles should be in order"
+            
+            # Stocks basket returns 5%, -5% and about 20.6% a period; everything else earns 0%
+            stock_returns = [(0.10 + 0.0) / 2, (-0.10 + 0.0) / 2, (120 / 99 - 1 + 60 / 50 - 1) / 2]
+            daily_rebalanced = 1.0
+            for r in stock_returns:
+                daily_rebalanced *= 1 + 0.7 * r
+            aggressive = results[4]
+            assert aggressive["rebalance_every"] == 1, "First frequency should come first"
+            assert round(aggressive["final_value"], 12) == round(daily_rebalanced, 12), "Rebalanced value should compound the weighted returns"
+            
+            held = results[5]
+            basket = (1 + stock_returns[0]) * (1 + stock_returns[1]) * (1 + stock_returns[2])
+            assert round(held["final_value"], 12) == round(0.3 + 0.7 * basket, 12), "Buy and hold should let the weights drift"
+            assert round(held["max_drawdown"], 12) == round(1 - (0.3 + 0.7 * 1.05 * 0.95) / (0.3 + 0.7 * 1.05), 12), "Drawdown should be peak to trough"
+            
+            values = [1.0, 0.3 + 0.7 * 1.05, 0.3 + 0.7 * 1.05 * 0.95, 0.3 + 0.7 * basket]
+            expected = calculate_risk_metrics([(values[i] - values[i - 1]) / values[i - 1] for i in range(1, 4)], 0.0)
+            assert round(held["sharpe_ratio"], 9) == round(expected[2], 9), "Sharpe should come from calculate_risk_metrics"
+            assert results[0]["volatility"] < results[4]["volatility"], "Conservative should be less volatile than aggressive"
+            
+            assert "error" in backtest_profiles({"historical_prices": {}})[0], "Missing prices should be reported"
+            
+            TestUtils.yakshaAssert("TestBacktestProfiles", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestBacktestProfiles", False, "functional")
+            pytest.fail(f"Backtest profiles test failed: {str(e)}")
+    
+    def test_incremental_report(self):
+        """Test the report graph reuses persisted results and recomputes only changed entries"""
+        try:
+            import tempfile
+            
+            portfolio = get_sample_portfolio()
+            transactions = get_sample_transactions()
+            market_data = get_sample_market_data()
+            with tempfile.TemporaryDirectory() as directory:
+                cache_path = os.path.join(directory, "report.cache")
+                reports, last_run = run_incremental_report(cache_path, portfolio, transactions, market_data)
+                assert set(last_run["computed"]) >= set(REPORT_NODES), "The first run should compute every report"
+                assert reports["portfolio_value"] == calculate_portfolio_value(portfolio), "Portfolio value should match"
+                assert reports["budget"] == categorize_transactions(*transactions), "Budget should match categorize_transactions"
+                assert reports["projection"] == generate_savings_projection(3000, 2000, 5, savings_rate=0.2), "Projection should match"
+                
+                # A fresh process with the same inputs reuses everything from disk
+                reports_again, last_run = run_incremental_report(cache_path, portfolio, transactions, market_data)
+                assert last_run["computed"] == [] and reports_again == reports, "Unchanged inputs should reuse persisted results"
+                
+                # One new price and one new transaction recompute only their entries
+                market_data["historical_prices"]["AAPL"].append(180)
+                transactions.append({"date": "2023-02-28", "type": "expense", "amount": 40.0, "category": "Groceries"})
+                reports, last_run = run_incremental_report(cache_path, portfolio, transactions, market_data)
+                assert "portfolio_value" not in last_run["computed"], "Reports without changed inputs should not rerun"
+                assert "risk" in last_run["computed"] and "budget" in last_run["computed"], "Changed reports should rerun"
+                assert last_run["entries_computed"] == 5, "Only the changed ticker, month and their merges should be computed"
+                assert reports["budget"]["total_expenses"] == categorize_transactions(*transactions)["total_expenses"], "Budget should include the new transaction"
+                
+                # Switching to exact arithmetic must not reuse the float results
+                exact_reports, last_run = run_incremental_report(cache_path, portfolio, transactions, market_data, numeric_mode="exact")
+                assert "budget" in last_run["computed"] and "projection" in last_run["computed"], "Money reports should rerun in exact mode"
+                assert "risk" not in last_run["computed"], "Reports that do not depend on the mode should be reused"
+                assert exact_reports["budget"] == categorize_transactions(*transactions, numeric_mode="exact"), "Exact budget should hold Decimals"
+                assert type(exact_reports["budget"]["total_income"]).__name__ == "Decimal", "Exact budget totals should not come from the float cache"
+                assert exact_reports["portfolio_value"] == calculate_portfolio_value(portfolio, numeric_mode="exact"), "Exact value should be a Decimal"
+            
+            graph = ComputationGraph()
+            graph.set_input("x", 2)
+            graph.add_node("square", lambda x: x * x, "x")
+            assert graph.run("square") == {"square": 4}, "A graph should compute without a cache file"
+            
+            TestUtils.yakshaAssert("TestIncrementalReport", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestIncrementalReport", False, "functional")
+            pytest.fail(f"Incremental report test failed: {str(e)}")
+    
+    def test_columnar_results(self):
+        """Test columnar tables round-trip through bytes and files and keep the dictionary shapes"""
+        try:
+            import tempfile
+            
+            portfolio = get_sample_portfolio()
+            performances = [calculate_stock_performance(stock) for stock in portfolio]
+            table = stock_performances_table(performances)
+            assert len(table) == 5 and list(table.rows()) == performances, "Rows view should equal the list of dictionaries"
+            assert list(table.column("dollar_change")) == [p["dollar_change"] for p in performances], "Numeric columns should be packed"
+            assert table.rows()[-1]["ticker"] == "JPM", "Rows should be indexable"
+            
+            # Handing the bytes to another reader needs no per-row parsing
+            allocation = calculate_sector_allocation(portfolio)
+            received = ColumnarTable.from_buffer(sector_allocation_table(allocation).to_bytes())
+            view = sector_allocation_view(received)
+            assert view == allocation, "Sector view should match calculate_sector_allocation"
+            assert view["sectors"]["Technology"]["value"] == 3150.0, "Sector rows should be keyed by sector"
+            
+            projection = generate_savings_projection(3000, 2000, 5, savings_rate=0.25)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "projection.col")
+                projection_table(projection).write(path)
+                mapped = ColumnarTable.open(path)
+                assert projection_view(mapped) == projection, "Projection view should match generate_savings_projection"
+                assert projection_view(mapped)["yearly_projection"][5]["cumulative_savings"] == 60000, "Years should be keys"
+                assert mapped.release(), "The file should unmap once views are dropped"
+            
+            # Exact-mode Decimals are stored as scaled integers and read back as Decimals
+            exact_projection = generate_savings_projection(3000, 2000, 5, savings_rate=0.25, numeric_mode="exact")
+            exact_view = projection_view(ColumnarTable.from_buffer(projection_table(exact_projection).to_bytes()))
+            assert exact_view == exact_projection, "Exact projection view should match generate_savings_projection"
+            assert type(exact_view["monthly_income"]).__name__ == "Decimal", "Decimal metadata should stay Decimal"
+            assert repr(exact_view["yearly_projection"][5]["cumulative_savings"]) == "Decimal('60000.00')", "Decimal columns should keep their scale"
+            
+            try:
+                ColumnarTable.from_buffer(b"not a table at all")
+                assert False, "Foreign buffers should be rejected"
+            except ValueError:
+                pass
+            
+            TestUtils.yakshaAssert("TestColumnarResults", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestColumnarResults", False, "functional")
+            pytest.fail(f"Columnar results test failed: {str(e)}")
+    
+    def test_tax_lot_book(self):
+        """Test realized gains under each lot method and positions usable by the portfolio functions"""
+        try:
+            trades = [
+                {"ticker": "AAPL", "quantity": 10, "price": 100.0, "date": "2023-01-03", "sector": "Technology"},
+                {"ticker": "AAPL", "quantity": 10, "price": 120.0, "date": "2023-02-01"},
+                {"ticker": "AAPL", "quantity": -15, "price": 130.0, "date": "2023-03-01"}
+            ]
+            expected = {"fifo": 10 * 30 + 5 * 10, "lifo": 10 * 10 + 5 * 30, "average": 15 * 20}
+            for method, gain in expected.items():
+                book = TaxLotBook(method)
+                assert book.process(trades) == 3, "Every trade should be processed"
+                assert round(book.realized_gains()["AAPL"], 9) == gain, f"{method} realized gain should match"
+                report = book.pnl_report({"AAPL": 140.0})
+                # Sale proceeds plus the value of the 5 remaining shares, less the 2,200 paid
+                assert round(report["total_pnl"], 9) == 15 * 130.0 + 5 * 140.0 - 2200.0, "Total P&L should not depend on the method"
+            
+            book = TaxLotBook("specific")
+            first = book.buy("MSFT", 5, 250.0, "2023-01-03", sector="Technology")
+            second = book.buy("MSFT", 5, 300.0, "2023-02-01")
+            assert book.sell("MSFT", 5, 310.0, lot_id=second) == 50.0, "Specific-ID should sell the chosen lot"
+            assert [lot["lot_id"] for lot in book.lots("MSFT")] == [first], "Only the other lot should remain open"
+            
+            positions = book.positions({"MSFT": 320.0})
+            assert positions == [{"ticker": "MSFT", "shares": 5, "purchase_price": 250.0, "current_price": 320.0, "sector": "Technology"}], "Positions should use open-lot cost"
+            assert analyze_portfolio_performance(positions)["total_gain_loss"] == 350.0, "Positions should feed analyze_portfolio_performance"
+            
+            try:
+                book.sell("MSFT", 50, 320.0, lot_id=first)
+                assert False, "Selling more than held should raise ValueError"
+            except ValueError:
+                pass
+            
+            # Generated ids never collide with ids chosen by the caller
+            book = TaxLotBook("specific")
+            book.buy("A", 10, 100.0, lot_id=1)
+            generated = book.buy("A", 10, 110.0)
+            assert generated != 1, "Generated lot ids should skip caller ids"
+            book.sell("A", 10, 120.0, lot_id=1)
+            assert book.sell("A", 10, 120.0, lot_id=generated) == 100.0, "Both lots should stay sellable by id"
+            
+            TestUtils.yakshaAssert("TestTaxLotBook", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestTaxLotBook", False, "functional")
+            pytest.fail(f"Tax lot book test failed: {str(e)}")
+    
+    def test_recurring_cash_flow_forecast(self):
+        """Test recurring bills are detected and the forecast drives the savings projection"""
+        try:
+            transactions = get_sample_transactions()
+            # A third month of the regular flows plus a one-off purchase
+            transactions += [
+                {"date": "2023-03-06", "type": "income", "amount": 3000.00, "category": "Salary"},
+                {"date": "2023-03-10", "type": "expense", "amount": 1200.00, "category": "Rent"},
+                {"date": "2023-03-16", "type": "expense", "amount": 210.00, "category": "Utilities"},
+                {"date": "2023-03-25", "type": "expense", "amount": 900.00, "category": "Entertainment"}
+            ]
+            recurring = detect_recurring_cash_flows(transactions)
+            assert sorted(p["category"] for p in recurring) == ["Rent", "Salary", "Utilities"], "Monthly bills and salary should be recurring"
+            rent = [p for p in recurring if p["category"] == "Rent"][0]
+            assert rent["amount"] == 1200.0 and rent["day_of_month"] == 10 and rent["occurrences"] == 3, "Rent pattern should be described"
+            
+            forecast = forecast_cash_flows(recurring, 12)
+            assert [month["month"] for month in forecast[:2]] == ["2023-04", "2023-05"], "Forecast should start after the ledger"
+            assert forecast[0]["net"] == 3000.0 - 1200.0 - 200.0, "Forecast should net the recurring flows"
+            
+            projection = generate_savings_projection(3000, 2000, 2, forecast=forecast)
+            assert projection["yearly_projection"][1]["yearly_savings"] == 12 * 1600.0, "Projection should use the forecast"
+            assert projection["yearly_projection"][2]["cumulative_savings"] == 24 * 1600.0, "Short forecasts should repeat"
+            flat = generate_savings_projection(3000, 2000, 2)
+            assert flat["yearly_projection"][1]["yearly_savings"] == 12000, "Without a forecast the flat projection is unchanged"
+            
+            # Rows already sorted by account can be streamed one account at a time
+            rows = [dict(t, account=a) for a in (1, 2) for t in sorted(transactions, key=lambda t: (t["type"], t["category"], t["date"]))]
+            assert len(list(stream_recurring_cash_flows(rows))) == 6, "Each account should get its own patterns"
+            
+            TestUtils.yakshaAssert("TestRecurringCashFlowForecast", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestRecurringCashFlowForecast", False, "functional")
+            pytest.fail(f"Recurring cash flow forecast test failed: {str(e)}")
+    
+    def test_performance_cursor(self):
+        """Test the cursor resumes from persisted state and matches the generator"""
+        try:
+            import tempfile
+            
+            monthly_data = {"Jan": 10000, "Feb": 10500, "Mar": 10300}
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "cursor.json")
+                cursor = PerformanceCursor(path=path)
+                first = list(cursor.advance(monthly_data))
+                assert first == list(monthly_performance_generator(monthly_data)), "First run should match the generator"
+                before = cursor.snapshot()
+                cursor.save()
+                
+                # A new process picks up where the last one stopped
+                monthly_data["Apr"] = 11000
+                resumed = PerformanceCursor(path=path)
+                assert resumed.snapshot() == before, "Saved state should load back unchanged"
+                new_months = list(resumed.advance(monthly_data))
+                assert new_months == list(monthly_performance_generator(monthly_data))[3:], "Only new months should be produced"
+                assert before.position == 3 and resumed.snapshot().position == 4, "Snapshots should not change after they are taken"
+                
+                stats = resumed.stats()
+                changes = [change for _, _, change in monthly_performance_generator(monthly_data)][1:]
+                assert stats["months"] == 4 and stats["last_value"] == 11000, "Stats should cover every month"
+                assert round(stats["average_change"], 9) == round(sum(changes) / 3, 9), "Average change should be running"
+                assert round(stats["max_drawdown"], 9) == round(200 / 10500 * 100, 9), "Drawdown should track the peak"
+                
+                try:
+                    list(resumed.advance({"Feb": 1, "Mar": 2, "May": 3, "Jun": 4, "Jul": 5}))
+                    assert False, "A rewritten history should raise ValueError"
+                except ValueError:
+                    pass
+            
+            TestUtils.yakshaAssert("TestPerformanceCursor", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestPerformanceCursor", False, "functional")
+            pytest.fail(f"Performance cursor test failed: {str(e)}")
+    
+    def test_compressed_price_series(self):
+        """Test compressed price series round-trip and feed the risk functions chunk by chunk"""
+        try:
+            from array import array
+            
+            prices = [round(100 + (i % 7) * 0.05 - (i % 11) * 0.03, 2) for i in range(4096)]
+            series = CompressedPriceSeries(prices, chunk_size=512)
+            assert len(series) == 4096 and list(series) == prices, "Round trip should be lossless"
+            assert series[-1] == prices[-1] and series[1300] == prices[1300], "Indexing should decode one chunk"
+            assert series.window(500, 530) == array("d", prices[500:530]), "Windows should span chunk boundaries"
+            assert series.nbytes() * 5 <= len(prices) * 8, "Tick-sized moves should compress well"
+            
+            # Streaming results match the list-based functions
+            returns = [(prices[i] - prices[i - 1]) / prices[i - 1] for i in range(1, len(prices))]
+            assert math.isclose(series_volatility(series), calculate_volatility(prices), rel_tol=1e-9), "Volatility should match"
+            assert math.isclose(calculate_volatility(series), calculate_volatility(prices), rel_tol=1e-12), "calculate_volatility should accept the series"
+            for streamed, expected in zip(series_risk_metrics(series, 0.0), calculate_risk_metrics(returns, 0.0)):
+                assert math.isclose(streamed, expected, rel_tol=1e-9, abs_tol=1e-15), "Risk metrics should match"
+            
+            # Prices without a short decimal form are still stored exactly
+            irregular = [100 * 1.0001 ** i for i in range(300)]
+            assert list(CompressedPriceSeries(irregular, chunk_size=64)) == irregular, "XOR fallback should be lossless"
+            
+            TestUtils.yakshaAssert("TestCompressedPriceSeries", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestCompressedPriceSeries", False, "functional")
+            pytest.fail(f"Compressed price series test failed: {str(e)}")
+    
+    
+    def test_batch_checkpoint_resume(self):
+        """Test a torn checkpoint line is dropped and a resume needs the same settings"""
+        try:
+            import json
+            import tempfile
+            
+            portfolio = get_sample_portfolio()
+            portfolios = [portfolio, portfolio[:2], portfolio[2:], portfolio[1:4], portfolio[:3]]
+            expected = list(run_portfolio_batch(portfolios, workers=0, chunk_size=2))
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "batch.checkpoint")
+                first = list(run_portfolio_batch(portfolios[:4], workers=0, chunk_size=2, checkpoint_path=path))
+                assert first == expected[:4], "Checkpointed run should match a plain run"
+                
+                # Simulate a crash in the middle of writing the next chunk
+                with open(path, "a") as checkpoint:
+                    checkpoint.write('{"chunk": 2, "resu')
+                resumed = list(run_portfolio_batch(portfolios, workers=0, chunk_size=2, checkpoint_path=path))
+                assert resumed == expected, "Resumed run should replay finished chunks and compute the rest"
+                with open(path) as checkpoint:
+                    records = [json.loads(line) for line in checkpoint]
+                assert [record.get("chunk") for record in records] == [None, 0, 1, 2], "Torn line should be replaced"
+                
+                try:
+                    list(run_portfolio_batch(portfolios, workers=0, chunk_size=3, checkpoint_path=path))
+                    assert False, "Resuming with another chunk size should raise ValueError"
+                except ValueError:
+                    pass
+            
+            TestUtils.yakshaAssert("TestBatchCheckpointResume", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestBatchCheckpointResume", False, "functional")
+            pytest.fail(f"Batch checkpoint resume test failed: {str(e)}")
+    
+    
+    def test_market_store_separate_readers(self):
+        """Test readers in separate processes leave the shared store in place when they exit"""
+        try:
+            import subprocess
+            
+            market_data = get_sample_market_data()
+            store = MarketDataStore(f"fas_readers_{os.getpid()}", create=True)
+            try:
+                store.publish(market_data)
+                script = (
+                    "import sys\n"
+                    "from financial_analysis_system import MarketDataStore\n"
+                    "reader = MarketDataStore(sys.argv[1])\n"
+                    "snapshot = reader.snapshot()\n"
+                    "print(snapshot['version'], list(snapshot['historical_prices']['MSFT'])[-1])\n"
+                    "del snapshot\n"
+                    "reader.close()\n"
+                )
+                root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                for _ in range(2):
+                    result = subprocess.run([sys.executable, "-c", script, store.store_name], cwd=root,
+                                            capture_output=True, text=True, check=True)
+                    assert result.stdout.split() == ["1", "280.0"], "Each reader process should see the published data"
+                
+                # The blocks survive the reader processes exiting
+                assert store.publish(market_data) == 2, "Owner should still publish after readers exit"
+                with MarketDataStore(store.store_name) as reader:
+                    assert reader.current_version() == 2, "Store should still be readable"
+            finally:
+                store.close()
+            
+            TestUtils.yakshaAssert("TestMarketStoreSeparateReaders", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestMarketStoreSeparateReaders", False, "functional")
+            pytest.fail(f"Market store separate readers test failed: {str(e)}")
+    
+    
+    def test_returns_store_recovery(self):
+        """Test the returns store realigns returns with prices after an interrupted append"""
+        try:
+            import tempfile
+            from array import array
+            
+            prices = [100.0, 102.0, 101.0, 105.0, 107.0, 106.0]
+            with tempfile.TemporaryDirectory() as directory:
+                store = ReturnsStore(directory)
+                store.append_prices("AAPL", prices[:2])
+                
+                # Crash after the prices were written but before their returns
+                with open(os.path.join(directory, "AAPL.prices.f64"), "ab") as prices_file:
+                    array("d", prices[2:4]).tofile(prices_file)
+                assert len(store.returns("AAPL")) == 1, "Reads should only see returns that were written"
+                store.append_prices("AAPL", prices[4:5])
+                
+                # Crash after the returns were written, halfway through the prices
+                with open(os.path.join(directory, "AAPL.simple.f64"), "ab") as returns_file:
+                    array("d", [0.5]).tofile(returns_file)
+                with open(os.path.join(directory, "AAPL.prices.f64"), "ab") as prices_file:
+                    prices_file.write(b"\0\0\0")
+                assert len(store.returns("AAPL")) == 4, "Uncommitted returns should not be visible"
+                
+                # Reads still work while every file ends in a partially written value
+                for kind in ("simple", "log"):
+                    with open(os.path.join(directory, f"AAPL.{kind}.f64"), "ab") as returns_file:
+                        returns_file.write(b"\0\0\0\0\0")
+                assert list(store.prices("AAPL")) == prices[:5], "Torn prices should not be read"
+                assert len(store.returns("AAPL")) == len(store.returns("AAPL", "log")) == 4, "Torn returns should not be read"
+                store.append_prices("AAPL", prices[5:])
+                
+                assert list(store.prices("AAPL")) == prices, "Prices should hold every committed append"
+                expected = [(b - a) / a for a, b in zip(prices, prices[1:])]
+                assert [round(r, 12) for r in store.returns("AAPL")] == [round(r, 12) for r in expected], "Simple returns should line up with prices"
+                assert len(store.returns("AAPL", "log")) == len(prices) - 1, "Log returns should line up with prices"
+                store.close()
+            
+            TestUtils.yakshaAssert("TestReturnsStoreRecovery", True, "functional")
+        except Exception as e:
+            TestUtils.yakshaAssert("TestReturnsStoreRecovery", False, "functional")
+            pytest.fail(f"Returns store recovery test failed: {str(e)}")
+    
+    
     
 
 if __name__ == '__main__':